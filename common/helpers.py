@@ -4,19 +4,30 @@ Shared utilities for Project H.I.V.E container management.
 This module provides:
 • Global settings & logging initialization
 • Rich exceptions that wrap low-level subprocess errors
-• A singleton PodmanRunner that standardizes command execution
+• A singleton PodmanRunner that standardizes command execution, with
+  read-only queries served over the Podman API socket when one is running
 • Network and Image managers for repeatable tasks
 • BaseContainerManager for common container lifecycle methods
 """
 from __future__ import annotations
+import atexit
+import http.client
+import socket
 import subprocess
 import logging
 import os
+import queue
 import threading
 import re
+from urllib.parse import quote
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:  # optional C parser for Podman's JSON output
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 # Logging setup – modules importing this share the same root logger
 _log_level = os.getenv("HIVE_LOG_LEVEL", "INFO").upper()
@@ -28,44 +39,60 @@ logger = logging.getLogger("hive")
 
 class PodmanError(RuntimeError):
     """Generic wrapper for subprocess.CalledProcessError raised by Podman CLI."""
-    def __init__(self, cmd: Sequence[str], stderr: str | None = None):
+    # Error-message patterns, compiled once rather than on every failure
+    _NAME_CONFLICT = re.compile(r'the container name "([^"]+)"')
+    _ALREADY_EXISTS = (
+        re.compile(r'container ([^ ]+) already exists', re.IGNORECASE),
+        re.compile(r'honeypot ([^ ]+) already exists', re.IGNORECASE),
+    )
+    _REWRITES = tuple((re.compile(p, re.IGNORECASE), r) for p, r in (
+        (r'permission denied', 'Permission denied'),
+        (r'no such container', 'Container not found'),
+        (r'container ([^ ]+) is already running', r'Container \1 is already running'),
+        (r'container ([^ ]+) is not running', r'Container \1 is not running'),
+    ))
+
+    def __init__(self, cmd: Sequence[str], stderr: str | None = None, status: int | None = None):
         self.cmd = " ".join(cmd)
         self.stderr = stderr or ""
+        # HTTP status for API failures; None for CLI failures
+        self.status = status
         self.msg = self._simplify_error_message()
         super().__init__(self.msg)
 
     def _simplify_error_message(self) -> str:
         """Convert technical Podman error messages to user-friendly ones."""
-        raw_error = f"Podman command failed: {self.cmd}\n{self.stderr}"
-        logger.debug(raw_error)
+        logger.debug("Podman command failed: %s\n%s", self.cmd, self.stderr)
+        stderr = self.stderr
         # Container name conflict
-        if "creating container storage: the container name" in self.stderr:
-            match = re.search(r'the container name "([^"]+)"', self.stderr)
+        if "creating container storage: the container name" in stderr:
+            match = self._NAME_CONFLICT.search(stderr)
             if match:
                 return f"Container {match.group(1)} already exists"
         # General 'already exists' patterns
-        if "already exists" in self.stderr.lower():
-            for pattern in [r'container ([^ ]+) already exists', r'honeypot ([^ ]+) already exists']:
-                match = re.search(pattern, self.stderr, re.IGNORECASE)
+        if "already exists" in stderr.lower():
+            for pattern in self._ALREADY_EXISTS:
+                match = pattern.search(stderr)
                 if match:
                     return f"Container {match.group(1)} already exists"
         # Permission and missing container patterns
-        patterns = [
-            (r'permission denied', 'Permission denied'),
-            (r'no such container', 'Container not found'),
-            (r'container ([^ ]+) is already running', r'Container \1 is already running'),
-            (r'container ([^ ]+) is not running', r'Container \1 is not running'),
-        ]
-        for pattern, replacement in patterns:
-            if re.search(pattern, self.stderr, re.IGNORECASE):
-                return re.sub(pattern, replacement, self.stderr, flags=re.IGNORECASE)
+        for pattern, replacement in self._REWRITES:
+            if pattern.search(stderr):
+                return pattern.sub(replacement, stderr)
         # Fallback for other errors
-        if "Error:" in self.stderr:
-            parts = self.stderr.split("Error:", 1)
-            msg = parts[1].strip()
+        if "Error:" in stderr:
+            msg = stderr.split("Error:", 1)[1].strip()
             return f"Error: {msg[:30]}..." if len(msg) > 30 else f"Error: {msg}"
         return "Command failed"
 
+def not_found(exc: Exception) -> bool:
+    """Whether a failed podman call means the container does not exist."""
+    status = getattr(exc, "status", None)
+    if status is not None:
+        return status == 404
+    # CLI failure: match the raw stderr, PodmanError rewrites "no such container"
+    return "no such" in getattr(exc, "stderr", str(exc)).lower()
+
 class ResourceError(RuntimeError):
     """Raised when host resources (disk, ports, permissions) are insufficient."""
 
@@ -87,8 +114,162 @@ class _SingletonMeta(type):
                 cls._instances[cls] = super().__call__(*args, **kwargs)
         return cls._instances[cls]
 
+def _podman_socket_path() -> Optional[str]:
+    """Locate a running Podman API socket (`podman system service` / podman.socket)."""
+    host = os.getenv("CONTAINER_HOST", "")
+    candidates = [host[len("unix://"):]] if host.startswith("unix://") else []
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        candidates.append(os.path.join(runtime_dir, "podman", "podman.sock"))
+    candidates.append("/run/podman/podman.sock")
+    for path in candidates:
+        if path and os.path.exists(path):
+            return path
+    return None
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a UNIX domain socket."""
+    def __init__(self, path: str, timeout: float = 10.0):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
 class PodmanRunner(metaclass=_SingletonMeta):
     """Executes Podman CLI commands with optional output capture & timeout."""
+    API_VERSION = "v4.0.0"
+
+    _UNRESOLVED = object()
+    # Idle API connections kept for reuse; extras beyond this are closed on check-in
+    POOL_SIZE = 8
+
+    def __init__(self):
+        # Socket discovery and connections are deferred to the first API call,
+        # so importing/instantiating the runner touches neither the filesystem
+        # nor any socket (and nothing is inherited across fork()).
+        self._socket_path: Any = self._UNRESOLVED
+        # Connections are checked out per request, so short-lived worker threads
+        # reuse them instead of each leaving one open
+        self._pool: queue.LifoQueue[_UnixHTTPConnection] = queue.LifoQueue(self.POOL_SIZE)
+
+    def _api_socket(self) -> Optional[str]:
+        if self._socket_path is self._UNRESOLVED:
+            path = _podman_socket_path() if hasattr(socket, "AF_UNIX") else None
+            if path:
+                logger.debug(f"Using Podman API socket at {path}")
+                atexit.register(self.close)
+            self._socket_path = path
+        return self._socket_path
+
+    def close(self) -> None:
+        """Close all idle kept-alive API connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _checkout(self) -> _UnixHTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return _UnixHTTPConnection(self._socket_path)
+
+    def _checkin(self, conn: _UnixHTTPConnection) -> None:
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @property
+    def api_available(self) -> bool:
+        return self._api_socket() is not None
+
+    def api_get(self, path: str) -> Optional[Any]:
+        """
+        GET a libpod endpoint over a kept-alive socket connection.
+        Returns None if no API socket is available so callers fall back to the CLI.
+        """
+        return self.api_request("GET", path)
+
+    def api_request(self, method: str, path: str, *, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Call a libpod endpoint; `timeout` overrides the socket timeout for slow
+        actions such as stop. Returns None when the API is unavailable.
+        `path` is sent as given: callers quote names and query values themselves.
+        """
+        if not self._api_socket():
+            return None
+        url = f"/{self.API_VERSION}/libpod/{path.lstrip('/')}"
+        for attempt in (1, 2):
+            # The retry always gets a new connection; other pooled ones may be stale too
+            conn = self._checkout() if attempt == 1 else _UnixHTTPConnection(self._socket_path)
+            reused = conn.sock is not None
+            sent = False
+            try:
+                conn.request(method, url)
+                sent = True
+                if timeout is not None:
+                    conn.sock.settimeout(timeout)
+                resp = conn.getresponse()
+                body = resp.read()
+                if timeout is not None and conn.sock:
+                    conn.sock.settimeout(conn.timeout)
+                self._checkin(conn)
+                break
+            except socket.timeout as exc:
+                # Podman may still be acting on it; neither retry nor re-run via the CLI
+                conn.close()
+                raise PodmanError([method, url], f"No response from the Podman API within "
+                                                 f"{timeout or conn.timeout:g}s") from exc
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                # A keep-alive connection the service already closed fails on send or
+                # before any response; only then is it safe to send the request again
+                stale = reused and (not sent or isinstance(
+                    exc, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)))
+                if stale and attempt == 1:
+                    continue
+                if sent:
+                    raise PodmanError([method, url], f"Podman API request failed: {exc}") from exc
+                logger.debug(f"Podman API unavailable at {self._socket_path}, using CLI")
+                return None
+        if resp.status >= 400:
+            try:
+                message = json_loads(body).get("message", "")
+            except ValueError:
+                message = body.decode("utf-8", errors="replace")
+            raise PodmanError([method, url], message, status=resp.status)
+        # 204 endpoints (e.g. */exists) answer with an empty body
+        return json_loads(body) if body else {}
+
+    # libpod endpoints for container lifecycle actions, used before falling back to the CLI
+    _CONTAINER_ACTIONS: Dict[str, Tuple[str, str]] = {
+        'start':   ('POST',   'containers/{}/start'),
+        'stop':    ('POST',   'containers/{}/stop'),
+        'restart': ('POST',   'containers/{}/restart'),
+        'rm':      ('DELETE', 'containers/{}?force=true'),
+    }
+    ACTION_TIMEOUT = 120.0  # stop/restart may wait out the container's grace period
+
+    def container_action(self, cmd: str, name: str) -> None:
+        """`podman start|stop|restart|rm -f <name>` over the API socket, or the CLI without one."""
+        method, path = self._CONTAINER_ACTIONS[cmd]
+        if self.api_request(method, path.format(quote(name, safe='')), timeout=self.ACTION_TIMEOUT) is None:
+            self.run(['podman', cmd, *(['-f'] if cmd == 'rm' else []), name])
+
+    def exists(self, kind: str, name: str) -> bool:
+        """`podman <kind> exists <name>` via the API socket, falling back to the CLI."""
+        try:
+            if self.api_get(f"{kind}s/{quote(name, safe='')}/exists") is not None:
+                return True
+        except PodmanError as exc:
+            if exc.status == 404:
+                return False
+        return subprocess.run(['podman', kind, 'exists', name]).returncode == 0
+
     def run(
         self,
         cmd: List[str],
@@ -116,15 +297,24 @@ class PodmanRunner(metaclass=_SingletonMeta):
 
 class NetworkManager:
     """Ensure that the Hive private network exists and provides utilities."""
+    # Networks already confirmed by this process; skips the podman exec on later calls
+    _ensured: set[str] = set()
     def __init__(self, runner: PodmanRunner | None = None):
         self.runner = runner or PodmanRunner()
     def ensure_exists(self, name: str | None = None) -> None:
         name = name or CONFIG.network_name
-        if subprocess.run(['podman', 'network', 'exists', name]).returncode == 0:
-            logger.debug(f"Network '{name}' already exists")
+        if name in self._ensured:
             return
-        self.runner.run(['podman', 'network', 'create', name])
-        logger.info(f"[✓] Network '{name}' created")
+        if self.runner.exists('network', name):
+            logger.debug(f"Network '{name}' already exists")
+        else:
+            self.runner.run(['podman', 'network', 'create', name])
+            logger.info(f"[✓] Network '{name}' created")
+        self._ensured.add(name)
+    @classmethod
+    def invalidate(cls) -> None:
+        """Forget confirmed networks so the next ensure_exists asks Podman again."""
+        cls._ensured.clear()
     def connect(self, container: str, *, alias: str | None = None, name: str | None = None):
         name = name or CONFIG.network_name
         cmd = ['podman', 'network', 'connect'] + (['--alias', alias] if alias else []) + [name, container]
@@ -133,17 +323,32 @@ class NetworkManager:
 
 class ImageManager:
     """Pulls or builds Podman images as necessary."""
+    # Tags already confirmed or built by this process
+    _built: set[str] = set()
+    # Images pulled by this process; `podman pull` contacts the registry every time
+    _pulled: set[str] = set()
     def __init__(self, runner: PodmanRunner | None = None):
         self.runner = runner or PodmanRunner()
+    @classmethod
+    def invalidate(cls) -> None:
+        """Forget pulled/built images so the next ensure_* call checks again."""
+        cls._built.clear()
+        cls._pulled.clear()
     def ensure_pulled(self, image: str) -> None:
+        if image in self._pulled:
+            return
         self.runner.run(['podman', 'pull', image])
+        self._pulled.add(image)
         logger.info(f"[✓] Image '{image}' present")
     def ensure_built(self, tag: str, dockerfile_dir: Path, dockerfile: str = 'Dockerfile') -> None:
-        if subprocess.run(['podman', 'image', 'exists', tag]).returncode == 0:
-            logger.debug(f"Image '{tag}' already built")
+        if tag in self._built:
             return
-        self.runner.run(['podman','build','-t',tag,'-f',dockerfile,str(dockerfile_dir)])
-        logger.info(f"[✓] Built image '{tag}'")
+        if self.runner.exists('image', tag):
+            logger.debug(f"Image '{tag}' already built")
+        else:
+            self.runner.run(['podman','build','-t',tag,'-f',dockerfile,str(dockerfile_dir)])
+            logger.info(f"[✓] Built image '{tag}'")
+        self._built.add(tag)
 
 class BaseContainerManager:
     """Base class providing common container lifecycle methods."""
@@ -157,7 +362,7 @@ class BaseContainerManager:
         self.network_mgr = NetworkManager(self.runner)
         self.image_mgr = ImageManager(self.runner)
     def exists(self) -> bool:
-        return subprocess.run(['podman','container','exists',self.name]).returncode == 0
+        return self.runner.exists('container', self.name)
     def create(self) -> None:
         if self.exists(): return
         self.pre_create()
@@ -165,19 +370,28 @@ class BaseContainerManager:
         self.post_create()
         logger.info(f"[✓] Container '{self.name}' created")
     def start(self):
-        self.runner.run(['podman','start',self.name])
+        self.runner.container_action('start', self.name)
         logger.info(f"[✓] Started '{self.name}'")
     def stop(self):
-        self.runner.run(['podman','stop',self.name])
+        self.runner.container_action('stop', self.name)
         logger.info(f"[✓] Stopped '{self.name}'")
     def delete(self):
         if not self.exists(): return
-        self.runner.run(['podman','rm','-f',self.name])
+        self.runner.container_action('rm', self.name)
         logger.info(f"[✓] Deleted '{self.name}'")
     def status(self) -> str:
+        return self._state(self.name)
+    def _state(self, name: str) -> str:
+        """Container state from a REST inspect, or `podman inspect` without the API."""
         try:
-            return self.runner.run(['podman','inspect','-f','{{.State.Status}}',self.name], return_output=True)
-        except PodmanError:
-            return 'not found'
+            data = self.runner.api_get(f"containers/{quote(name, safe='')}/json")
+            if data is not None:
+                return data["State"]["Status"]
+            return self.runner.run(['podman','inspect','-f','{{.State.Status}}',name], return_output=True)
+        except PodmanError as exc:
+            if not_found(exc):
+                return 'not found'
+            logger.warning("Could not inspect container '%s': %s", name, exc)
+            return 'unknown'
     def pre_create(self): pass
     def post_create(self): pass
@@ -3,12 +3,10 @@
 Delegates all orchestration logic to the HoneypotManager model.
 Defines routes, schemas, and HTTP error mapping only.
 """
-from typing import Any, Dict, List
-import json
-import yaml
-from pathlib import Path
+from typing import Any, Callable, Dict, List
 
 from fastapi import APIRouter, HTTPException, status, Path as PathParam
+from starlette.concurrency import run_in_threadpool
 
 from common.helpers import PodmanRunner, PodmanError, ResourceError, logger
 from honeypot_manager.models.Honeypot import HoneypotManager, HoneypotConfig
@@ -63,20 +61,12 @@ def _err(exc: Exception) -> None:
 # ──────────────────────────────────────────────────────────────────────────────
 _runner = PodmanRunner()
 
-def _list_container_ids(*filters: str) -> List[str]:
-    cmd = ["podman", "ps", "-a", "--format", "json"] + [f"--filter={f}" for f in filters]
-    out = _runner.run(cmd, return_output=True) or "[]"
-    return [c["Id"] for c in json.loads(out)]
-
-
-def _pack_responses(ids: List[str]) -> List[HoneypotResponse]:
-    """Convert Podman container IDs into API response objects."""
-    result: List[HoneypotResponse] = []
-    for cid in ids:
-        hp = HoneypotManager()
-        if hp.get_honeypot_details(cid):
-            result.append(HoneypotResponse(**hp.to_dict()))
-    return result
+def _list_packed(*filters: str) -> List[HoneypotResponse]:
+    """Honeypots matching `filters` as API response objects, from one list call."""
+    return [
+        HoneypotResponse(**hp.to_dict())
+        for hp in HoneypotManager.list_honeypots(*filters, runner=_runner)
+    ]
 
 # ──────────────────────────────────────────────────────────────────────────────
 # CRUD Endpoints
@@ -85,8 +75,7 @@ def _pack_responses(ids: List[str]) -> List[HoneypotResponse]:
 async def list_all() -> List[HoneypotResponse]:
     """List all honeypot containers."""
     try:
-        ids = _list_container_ids("label=service=hive-honeypot-manager")
-        return _pack_responses(ids)
+        return await run_in_threadpool(_list_packed, "label=service=hive-honeypot-manager")
     except Exception as exc:
         _err(exc)
 
@@ -95,7 +84,7 @@ async def inspect(name: str) -> HoneypotResponse:
     """Inspect a single honeypot by container name."""
     try:
         hp = HoneypotManager()
-        if not hp.get_honeypot_details(name):
+        if not await run_in_threadpool(hp.get_honeypot_details, name):
             raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Honeypot not found")
         return HoneypotResponse(**hp.to_dict())
     except Exception as exc:
@@ -107,7 +96,7 @@ async def create(body: HoneypotCreate) -> HoneypotResponse:
     try:
         hp = HoneypotManager()
         data = body.model_dump()
-        hp.create_honeypot(**data)
+        await run_in_threadpool(hp.create_honeypot, **data)
         return HoneypotResponse(**hp.to_dict())
     except Exception as exc:
         _err(exc)
@@ -115,14 +104,21 @@ async def create(body: HoneypotCreate) -> HoneypotResponse:
 # ──────────────────────────────────────────────────────────────────────────────
 # Lifecycle Endpoints
 # ──────────────────────────────────────────────────────────────────────────────
+_LIFECYCLE_ACTIONS: Dict[str, Callable[[HoneypotManager], None]] = {
+    "start":   HoneypotManager.start_honeypot,
+    "stop":    HoneypotManager.stop_honeypot,
+    "restart": HoneypotManager.restart_honeypot,
+    "delete":  HoneypotManager.delete_honeypot,
+}
+
+
 def _lifecycle_action(name: str, action: str, msg: str) -> Dict[str, Any]:
     hp = HoneypotManager()
     if not hp.get_honeypot_details(name):
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Honeypot '{name}' not found")
     try:
-        getattr(hp, f"{action}_honeypot")()
-        if action != "delete":
-            hp.get_honeypot_details(hp.honeypot_name)
+        # the model re-inspects the container itself after each action
+        _LIFECYCLE_ACTIONS[action](hp)
         return {"message": msg, "honeypot": hp.to_dict()}
     except Exception as exc:
         _err(exc)
@@ -130,22 +126,22 @@ def _lifecycle_action(name: str, action: str, msg: str) -> Dict[str, Any]:
 @router.post("/{name}/start")
 async def start(name: str) -> Dict[str, Any]:
     """Start a stopped honeypot."""
-    return _lifecycle_action(name, "start",   "Honeypot started successfully")
+    return await run_in_threadpool(_lifecycle_action, name, "start",   "Honeypot started successfully")
 
 @router.post("/{name}/stop")
 async def stop(name: str) -> Dict[str, Any]:
     """Stop a running honeypot."""
-    return _lifecycle_action(name, "stop",    "Honeypot stopped successfully")
+    return await run_in_threadpool(_lifecycle_action, name, "stop",    "Honeypot stopped successfully")
 
 @router.post("/{name}/restart")
 async def restart(name: str) -> Dict[str, Any]:
     """Restart an existing honeypot."""
-    return _lifecycle_action(name, "restart", "Honeypot restarted successfully")
+    return await run_in_threadpool(_lifecycle_action, name, "restart", "Honeypot restarted successfully")
 
 @router.delete("/{name}")
 async def delete(name: str) -> Dict[str, Any]:
     """Delete a honeypot (must be stopped first)."""
-    return _lifecycle_action(name, "delete",  "Honeypot deleted successfully")
+    return await run_in_threadpool(_lifecycle_action, name, "delete",  "Honeypot deleted successfully")
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Metadata & Filters
@@ -165,15 +161,11 @@ async def get_type_config(t: str) -> Dict[str, Any]:
 
 @router.get("/types/{t}/auth-details")
 async def get_auth_details(t: str) -> Dict[str, Any]:
-    cfg_path = (
-        Path(__file__).resolve().parent.parent
-        / "honeypots"
-        / t
-        / "config.yaml"
-    )
-    if not cfg_path.exists():
+    cfg_path = HoneypotManager.type_config_path(t)
+    try:
+        cfg = HoneypotManager.load_type_config(cfg_path)
+    except FileNotFoundError:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="No auth/banner found")
-    cfg = yaml.safe_load(cfg_path.read_text()) or {}
 
     data: Dict[str, Any] = {}
     if "authentication" in cfg:
@@ -188,10 +180,11 @@ async def get_auth_details(t: str) -> Dict[str, Any]:
 async def list_by_type(t: str) -> List[HoneypotResponse]:
     """List honeypots filtered by type `t`."""
     try:
-        if t not in HoneypotConfig.types():
+        if not HoneypotConfig.exists(t):
             raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Unknown type")
-        ids = _list_container_ids("label=service=hive-honeypot-manager", f"label=hive.type={t}")
-        hps = _pack_responses(ids)
+        hps = await run_in_threadpool(
+            _list_packed, "label=service=hive-honeypot-manager", f"label=hive.type={t}"
+        )
         if not hps:
             raise HTTPException(status.HTTP_404_NOT_FOUND, detail="No honeypots of this type")
         return hps
@@ -205,8 +198,7 @@ async def list_by_status(st: str) -> List[HoneypotResponse]:
     if st not in valid:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=f"Status must be one of: {valid}")
     try:
-        ids = _list_container_ids("label=service=hive-honeypot-manager")
-        hps = _pack_responses(ids)
+        hps = await run_in_threadpool(_list_packed, "label=service=hive-honeypot-manager")
         filtered = [hp for hp in hps if (st=="started" and hp.status=="running") or hp.status==st]
         if not filtered:
             raise HTTPException(status.HTTP_404_NOT_FOUND, detail="No honeypots with that status")
@@ -227,7 +219,7 @@ async def check_port(port: int = PathParam(..., description="Port to test")) ->
     if port < 1024:
         return PortCheckResponse(available=False, message="Root required for privileged ports")
     try:
-        in_use = HoneypotManager().is_port_in_use(port)
+        in_use = await run_in_threadpool(HoneypotManager().is_port_in_use, port)
         return PortCheckResponse(
             available=not in_use,
             message=f"Port {port} {'in use' if in_use else 'available'}"
@@ -15,14 +15,18 @@ LOG_DIR = os.path.abspath('./logs')
 os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, 'ftp_honeypot.log')
 
-# Configure logging
+# Configure logging; an unknown LOG_LEVEL falls back to INFO instead of failing at import
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+_log_level = logging.getLevelName(LOG_LEVEL)
 logging.basicConfig(
     filename=LOG_FILE,
-    level=logging.INFO,
+    level=_log_level if isinstance(_log_level, int) else logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 logger = logging.getLogger('ftp_honeypot')
+if not isinstance(_log_level, int):
+    logger.warning("Unknown LOG_LEVEL %r, using INFO", LOG_LEVEL)
 
 # Define the malware directory
 MALWARE_DIR = os.path.abspath('./malware')
@@ -65,17 +69,10 @@ class FTPServer(FTPHandler):
         self.session_start = datetime.datetime.now()
         self.session_id = f"{self.client_ip}:{self.client_port}-{int(self.session_start.timestamp())}"
         
-        logger.info(f"New connection established")
-        logger.info(f"Client IP: {self.client_ip}")
-        logger.info(f"Client Port: {self.client_port}")
-        logger.info(f"Session Started: {self.session_start.strftime('%Y-%m-%d %H:%M:%S')}")
-        logger.info(f"Session ID: {self.session_id}")
-        
         # Get client machine info from FTP client banner if available
         self.client_info = self._get_client_info()
-        if self.client_info:
-            logger.info(f"Client Machine: {self.client_info}")
-            
+        logger.info("New connection from %s:%s, session %s, client %s",
+                    self.client_ip, self.client_port, self.session_id, self.client_info)
         super().on_connect()
 
     def on_disconnect(self):
@@ -83,9 +80,8 @@ class FTPServer(FTPHandler):
         if hasattr(self, 'session_start') and self.session_start:
             session_end = datetime.datetime.now()
             session_duration = session_end.timestamp() - self.session_start.timestamp()
-            logger.info(f"Client disconnected: {self.client_ip}:{self.client_port}")
-            logger.info(f"Session Duration: {session_duration:.2f} seconds")
-            logger.info(f"Session Ended: {session_end.strftime('%Y-%m-%d %H:%M:%S')}")
+            logger.info("Client disconnected: %s:%s after %.2f seconds",
+                        self.client_ip, self.client_port, session_duration)
             
             # If the user authenticated, send the session data to NATS
             if self.authenticated:
@@ -96,27 +92,22 @@ class FTPServer(FTPHandler):
     def on_login(self, username):
         """Log successful logins to the server"""
         self.authenticated = True
-        logger.info(f"Successfully authenticated")
-        logger.info(f"Username: {self.username}")
-        logger.info(f"Password: {self.password}")
-        logger.info(f"Client: {self.client_ip}:{self.client_port}")
+        logger.info("Successful login: %s / %s from %s:%s",
+                    self.username, self.password, self.client_ip, self.client_port)
         super().on_login(username)
         
     def on_login_failed(self, username, password):
         """Log failed login attempts"""
         self.username = username
         self.password = password
-        logger.info(f"Failed login attempt")
-        logger.info(f"Username: {username}")
-        logger.info(f"Password: {password}")
-        logger.info(f"Client: {self.client_ip}:{self.client_port}")
+        logger.info("Failed login: %s / %s from %s:%s",
+                    username, password, self.client_ip, self.client_port)
         super().on_login_failed(username, password)
         
     def on_file_sent(self, file):
         """Log when a file is downloaded by the client"""
-        logger.info(f"File downloaded: {os.path.basename(file)}")
-        logger.info(f"By: {self.username} from {self.client_ip}:{self.client_port}")
-        logger.info(f"Full path: {file}")
+        logger.info("File downloaded: %s by %s from %s:%s",
+                    file, self.username, self.client_ip, self.client_port)
         
         # Add this command to the executed_commands list
         self.commands_executed.append(f"DOWNLOAD {os.path.basename(file)}")
@@ -125,19 +116,13 @@ class FTPServer(FTPHandler):
 
     def on_file_received(self, file):
         """Log when a file is uploaded by the client and move it to malware dir with safe permissions"""
-        logger.info(f"File uploaded: {os.path.basename(file)}")
-        logger.info(f"By: {self.username} from {self.client_ip}:{self.client_port}")
-        logger.info(f"Full path: {file}")
+        logger.info("File uploaded: %s by %s from %s:%s",
+                    file, self.username, self.client_ip, self.client_port)
         
         # Add this command to the executed_commands list
         self.commands_executed.append(f"UPLOAD {os.path.basename(file)}")
         
         try:
-            # Make sure the malware directory exists
-            if not os.path.exists(MALWARE_DIR):
-                os.makedirs(MALWARE_DIR, exist_ok=True)
-                os.chmod(MALWARE_DIR, 0o755)
-            
             # Move file to malware directory
             dest_path = os.path.join(MALWARE_DIR, os.path.basename(file))
             if os.path.exists(dest_path):
@@ -147,43 +132,46 @@ class FTPServer(FTPHandler):
                 new_filename = f"{filename}_{timestamp}{ext}"
                 dest_path = os.path.join(MALWARE_DIR, new_filename)
             
-            shutil.move(file, dest_path)
+            try:
+                shutil.move(file, dest_path)
+            except FileNotFoundError:
+                # The quarantine dir is created at import; recreate it only if it has since vanished
+                os.makedirs(MALWARE_DIR, exist_ok=True)
+                os.chmod(MALWARE_DIR, 0o755)
+                shutil.move(file, dest_path)
             # Set file permissions: read-only, not executable
             os.chmod(dest_path, 0o444)  # Owner/group/other: read only
-            logger.info(f"File securely moved to: {dest_path}")
-            logger.info(f"Permissions set to read-only (not executable)")
+            logger.info("File quarantined read-only at %s", dest_path)
         except Exception as e:
-            logger.error(f"Error moving file to malware directory: {e}")
+            logger.error("Error moving file to malware directory: %s", e)
         
         super().on_file_received(file)
         
     def on_incomplete_file_sent(self, file):
         """Log when a file download is incomplete"""
-        logger.warning(f"Incomplete file download: {os.path.basename(file)}")
-        logger.warning(f"By: {self.username} from {self.client_ip}:{self.client_port}")
+        logger.warning("Incomplete file download: %s by %s from %s:%s",
+                       os.path.basename(file), self.username, self.client_ip, self.client_port)
         super().on_incomplete_file_sent(file)
 
     def on_incomplete_file_received(self, file):
         """Log and remove incomplete file uploads"""
-        logger.warning(f"Incomplete file upload: {os.path.basename(file)}")
-        logger.warning(f"By: {self.username} from {self.client_ip}:{self.client_port}")
-        logger.warning(f"Removing partial file")
+        logger.warning("Incomplete file upload: %s by %s from %s:%s, removing partial file",
+                       os.path.basename(file), self.username, self.client_ip, self.client_port)
         try:
             os.remove(file)
-            logger.info(f"Partial file removed: {file}")
         except Exception as e:
-            logger.error(f"Error removing partial file: {e}")
+            logger.error("Error removing partial file: %s", e)
         super().on_incomplete_file_received(file)
         
     def on_enter_passive(self):
         """Log passive mode entry"""
-        logger.info(f"Client {self.client_ip}:{self.client_port} entered passive mode")
+        logger.debug("Client %s:%s entered passive mode", self.client_ip, self.client_port)
         super().on_enter_passive()
         
     def on_directory_listed(self, path):
         """Log directory listings"""
-        logger.info(f"Directory listed: {path}")
-        logger.info(f"By: {self.username} from {self.client_ip}:{self.client_port}")
+        logger.info("Directory listed: %s by %s from %s:%s",
+                    path, self.username, self.client_ip, self.client_port)
         
         # Add this command to the executed_commands list
         self.commands_executed.append(f"LIST {path}")
@@ -198,10 +186,7 @@ class FTPServer(FTPHandler):
         
     def process_command(self, cmd, *args, **kwargs):
         """Log all FTP commands received from clients"""
-        logger.info(f"Command: {cmd}")
-        if args:
-            logger.info(f"Args: {' '.join(args)}")
-        logger.info(f"From: {self.client_ip}:{self.client_port}")
+        logger.info("Command from %s:%s: %s %s", self.client_ip, self.client_port, cmd, " ".join(args))
         
         # Track commands for the NATS log
         if cmd not in ['PASS', 'FEAT', 'OPTS', 'PWD', 'TYPE', 'SYST', 'PORT', 'PASV', 'EPSV']:
@@ -234,9 +219,9 @@ class FTPServer(FTPHandler):
             
             # Create async task to send to NATS
             asyncio.run(self._async_send_to_nats(log_data))
-            logger.info(f"Session log for {self.session_id} sent to NATS")
+            logger.info("Session log for %s sent to NATS", self.session_id)
         except Exception as e:
-            logger.error(f"Failed to send log to NATS: {e}")
+            logger.error("Failed to send log to NATS: %s", e)
     
     async def _async_send_to_nats(self, log_data: Dict[str, Any]):
         """Async function to send data to NATS"""
@@ -1,5 +1,7 @@
 import os
 import datetime
+import functools
+import hmac
 import logging
 import paramiko
 import threading
@@ -7,7 +9,7 @@ import asyncio
 import random
 import time
 import socket
-from typing import Dict, Any, Tuple, List, Optional
+from typing import Dict, Any, Tuple, List, NamedTuple, Optional, Sequence
 from NATSJetstreamPublisher import NATSJetstreamPublisher
 
 # Logging Setup - Ensure correct container paths
@@ -15,8 +17,11 @@ LOG_DIR = os.path.abspath('/app/logs')
 os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, 'ssh_honeypot.log')
 
+# An unknown LOG_LEVEL falls back to INFO instead of failing at import
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+_log_level = logging.getLevelName(LOG_LEVEL)
 logging.basicConfig(
-    level=logging.INFO,
+    level=_log_level if isinstance(_log_level, int) else logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S',
     handlers=[
@@ -25,16 +30,210 @@ logging.basicConfig(
     ]
 )
 logger = logging.getLogger('ssh_honeypot')
+if not isinstance(_log_level, int):
+    logger.warning("Unknown LOG_LEVEL %r, using INFO", LOG_LEVEL)
 
-class SSHServer(paramiko.ServerInterface):
+# The virtual filesystem is static, so it is built once and shared by every session
+_FILESYSTEM: Dict[str, Dict[str, Any]] = {
+    "/": {"type": "dir", "content": ["bin", "boot", "dev", "etc", "home", "lib", "media", "mnt", "opt", "proc", "root", "run", "sbin", "srv", "sys", "tmp", "usr", "var"]},
+    "/home": {"type": "dir", "content": ["ubuntu"]},
+    "/home/ubuntu": {"type": "dir", "content": [".bashrc", ".profile", ".ssh", "Documents", "Downloads"]},
+    "/home/ubuntu/.ssh": {"type": "dir", "content": ["authorized_keys", "id_rsa", "id_rsa.pub", "known_hosts"]},
+    "/home/ubuntu/Documents": {"type": "dir", "content": ["notes.txt", "todo.txt"]},
+    "/home/ubuntu/Downloads": {"type": "dir", "content": []},
+    "/home/ubuntu/notes.txt": {"type": "file", "content": "Remember to update server configs\nBackup database on Friday\n"},
+    "/home/ubuntu/todo.txt": {"type": "file", "content": "1. Update packages\n2. Configure firewall\n3. Check logs\n"},
+    "/etc": {"type": "dir", "content": ["passwd", "shadow", "hosts", "resolv.conf", "ssh", "crontab"]},
+    "/etc/ssh": {"type": "dir", "content": ["sshd_config", "ssh_config"]},
+    "/etc/passwd": {"type": "file", "content": "root:x:0:0:root:/root:/bin/bash\ndaemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin\nbin:x:2:2:bin:/bin:/usr/sbin/nologin\nsys:x:3:3:sys:/dev:/usr/sbin/nologin\nsync:x:4:65534:sync:/bin:/bin/sync\ngames:x:5:60:games:/usr/games:/usr/sbin/nologin\nman:x:6:12:man:/var/cache/man:/usr/sbin/nologin\nlp:x:7:7:lp:/var/spool/lpd:/usr/sbin/nologin\nubuntu:x:1000:1000:Ubuntu:/home/ubuntu:/bin/bash\n"},
+    "/etc/hosts": {"type": "file", "content": "127.0.0.1 localhost\n127.0.1.1 ubuntu-server\n\n# The following lines are desirable for IPv6 capable hosts\n::1     ip6-localhost ip6-loopback\nfe00::0 ip6-localnet\nff00::0 ip6-mcastprefix\nff02::1 ip6-allnodes\nff02::2 ip6-allrouters\n"}
+}
+
+# Directory paths, for O(1) "is this a directory" checks
+_DIRS = frozenset(path for path, node in _FILESYSTEM.items() if node["type"] == "dir")
+
+_LS_TERM_WIDTH = 80
+
+# Longest command line accepted before the session is dropped
+_MAX_LINE_BYTES = 16 * 1024
+
+# Bytes requested from the channel per read
+_RECV_SIZE = 4096
+
+
+# MOTD sent after the shell opens; the placeholders are filled per session
+_WELCOME_BANNER = (
+    "\r\n"
+    "Welcome to Ubuntu 20.04.6 LTS (GNU/Linux 5.15.0-88-generic x86_64)\r\n"
+    "\r\n"
+    " * Documentation:  https://help.ubuntu.com\r\n"
+    " * Management:     https://landscape.canonical.com\r\n"
+    " * Support:        https://ubuntu.com/advantage\r\n"
+    "\r\n"
+    "  System information as of {now}\r\n"
+    "\r\n"
+    "  System load:  0.{load}\r\n"
+    "  Usage of /:   {disk_pct}% of {disk_gb}GB\r\n"
+    "  Memory usage: {mem_pct}%\r\n"
+    "  Swap usage:   {swap_pct}%\r\n"
+    "  Processes:    {procs}\r\n"
+    "\r\n"
+    "{updates} updates can be applied immediately.\r\n"
+    "{security_updates} of these updates are standard security updates.\r\n"
+    "To see these additional updates run: apt list --upgradable\r\n"
+    "\r\n"
+    "Last login: {last_login} from {fake_ip}\r\n"
+)
+
+
+def _join(base: str, rel: str) -> str:
+    """Join a virtual-filesystem path with a relative component."""
+    if base.endswith('/'):
+        return base + rel
+    return base + '/' + rel
+
+
+def _to_wire(text: str) -> bytes:
+    """
+    Encode command output for the terminal.
+
+    Args:
+        text: Output with any mix of line endings
+
+    Returns:
+        UTF-8 bytes with CRLF line endings and exactly one trailing CRLF,
+        or b"" when there is no output
+    """
+    if not text:
+        return b""
+    data = text.encode()
+    # Handler output is LF-only almost always, so skip CR normalisation then
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    data = data.replace(b'\n', b'\r\n')
+    if not data.endswith(b'\r\n'):
+        data += b'\r\n'
+    return data
+
+
+# Constant command output, encoded once
+_PS_OUTPUT = _to_wire(
+    "  PID TTY          TIME CMD\n"
+    " 1234 pts/0    00:00:00 bash\n"
+    " 1256 pts/0    00:00:00 sshd\n"
+    " 2345 pts/0    00:00:00 ps"
+)
+_UNAME_OUTPUT = _to_wire("Linux")
+_UNAME_ALL_OUTPUT = _to_wire(
+    "Linux ubuntu-server 5.15.0-88-generic #98-Ubuntu SMP Mon Mar 18 14:22:38 UTC 2024 "
+    "x86_64 x86_64 x86_64 GNU/Linux"
+)
+
+
+class ParsedCommand(NamedTuple):
+    """A command line reduced to its lower-cased name and arguments."""
+    name: str
+    args: Tuple[str, ...]
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_command_line(cmd_line: str) -> ParsedCommand:
+    """
+    Parse a raw command line. Results are cached because automated
+    clients tend to repeat the same commands; the bound keeps hostile
+    input from growing the cache.
+
+    Args:
+        cmd_line: Raw line as typed by the client
+
+    Returns:
+        Parsed command, with an empty name for blank input.
+        Pipelines only keep their first stage.
+    """
+    # partition() stops at the first '|' and never builds a list
+    parts = cmd_line.partition('|')[0].split()
+    if not parts:
+        return ParsedCommand("", ())
+    return ParsedCommand(parts[0].lower(), tuple(parts[1:]))
+
+
+def _build_ls_index() -> Dict[Tuple[str, bool], Tuple[bytes, Tuple[Tuple[bytes, bytes, bytes], ...]]]:
+    """
+    Precompute every directory listing once at import.
+
+    Returns:
+        Mapping of (directory, show_hidden) to the encoded columnar listing
+        and the encoded (mode/links, size, name) rows used by the long format
+    """
+    index = {}
+    for path, node in _FILESYSTEM.items():
+        if node["type"] != "dir":
+            continue
+        for show_hidden in (False, True):
+            entries = []
+            for item in node["content"]:
+                if not show_hidden and item.startswith('.'):
+                    continue
+                child = _FILESYSTEM.get(_join(path, item))
+                entries.append((item, child is not None and child["type"] == "dir", child))
+            # Directories first, then files, each sorted by name
+            entries.sort(key=lambda e: (not e[1], e[0]))
+
+            columns = ""
+            if entries:
+                col_width = max(len(item) for item, _, _ in entries) + 2
+                num_cols = max(1, _LS_TERM_WIDTH // col_width)
+                rows = []
+                for i in range(0, len(entries), num_cols):
+                    rows.append("".join(
+                        (f"{item}/" if is_dir else item).ljust(col_width)
+                        for item, is_dir, _ in entries[i:i + num_cols]
+                    ))
+                columns = "\n".join(rows)
+
+            long_rows = []
+            for item, is_dir, child in entries:
+                if is_dir:
+                    long_rows.append((b"drwxr-xr-x 2", b"4096", item.encode()))
+                else:
+                    content = child.get("content", "") if child else ""
+                    size = len(content) if content else random.randint(100, 4000)
+                    long_rows.append((b"-rw-r--r-- 1", b"%d" % size, item.encode()))
+
+            index[(path, show_hidden)] = (_to_wire(columns), tuple(long_rows))
+    return index
+
+
+_LS_INDEX = _build_ls_index()
+
+# File contents as sent by cat, encoded once
+_CAT_OUTPUT: Dict[str, bytes] = {
+    path: _to_wire(node.get("content", ""))
+    for path, node in _FILESYSTEM.items()
+    if path not in _DIRS
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _load_host_key(path: str) -> paramiko.PKey:
+    """Parse the host key file once per process and share it across connections."""
+    try:
+        return paramiko.ECDSAKey(filename=path)
+    except paramiko.SSHException:
+        # Key files generated before the switch to ECDSA are RSA
+        return paramiko.RSAKey(filename=path)
+
+class _SSHSession(paramiko.ServerInterface):
+    """Per-connection paramiko server interface and fake shell state."""
     # Exit command keywords to filter out
-    EXIT_COMMANDS = ['exit', 'quit', 'logout']
+    EXIT_COMMANDS = frozenset({'exit', 'quit', 'logout'})
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, server: "SSHServer"):
         self.event = threading.Event()
-        self.allowed_users = config.get('authentication', {}).get('allowed_users', [])
-        self.ssh_key_path = config.get('ssh', {}).get('key_path', 'ssh_host_rsa_key')
-        self.banner = config.get('ssh', {}).get('banner', 'SSH-2.0-OpenSSH_8.2p1')
+        # Shared, read-only state owned by the SSHServer
+        self.credentials = server.credentials
+        self.banner = server.banner
+        self._host_key = server.host_key
 
         self.client_ip = None
         self.client_port = None
@@ -49,63 +248,8 @@ class SSHServer(paramiko.ServerInterface):
         # Virtual filesystem and session state
         self.current_dir = "/home/ubuntu"
         self.hostname = "ubuntu-server"
-        self.filesystem = self._setup_virtual_filesystem()
+        self.filesystem = _FILESYSTEM
         self.command_history = []
-        
-        self._generate_ssh_key()
-
-    def _setup_virtual_filesystem(self) -> Dict[str, Any]:
-        """Create a simple virtual filesystem structure."""
-        return {
-            "/": {"type": "dir", "content": ["bin", "boot", "dev", "etc", "home", "lib", "media", "mnt", "opt", "proc", "root", "run", "sbin", "srv", "sys", "tmp", "usr", "var"]},
-            "/home": {"type": "dir", "content": ["ubuntu"]},
-            "/home/ubuntu": {"type": "dir", "content": [".bashrc", ".profile", ".ssh", "Documents", "Downloads"]},
-            "/home/ubuntu/.ssh": {"type": "dir", "content": ["authorized_keys", "id_rsa", "id_rsa.pub", "known_hosts"]},
-            "/home/ubuntu/Documents": {"type": "dir", "content": ["notes.txt", "todo.txt"]},
-            "/home/ubuntu/Downloads": {"type": "dir", "content": []},
-            "/home/ubuntu/notes.txt": {"type": "file", "content": "Remember to update server configs\nBackup database on Friday\n"},
-            "/home/ubuntu/todo.txt": {"type": "file", "content": "1. Update packages\n2. Configure firewall\n3. Check logs\n"},
-            "/etc": {"type": "dir", "content": ["passwd", "shadow", "hosts", "resolv.conf", "ssh", "crontab"]},
-            "/etc/ssh": {"type": "dir", "content": ["sshd_config", "ssh_config"]},
-            "/etc/passwd": {"type": "file", "content": "root:x:0:0:root:/root:/bin/bash\ndaemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin\nbin:x:2:2:bin:/bin:/usr/sbin/nologin\nsys:x:3:3:sys:/dev:/usr/sbin/nologin\nsync:x:4:65534:sync:/bin:/bin/sync\ngames:x:5:60:games:/usr/games:/usr/sbin/nologin\nman:x:6:12:man:/var/cache/man:/usr/sbin/nologin\nlp:x:7:7:lp:/var/spool/lpd:/usr/sbin/nologin\nubuntu:x:1000:1000:Ubuntu:/home/ubuntu:/bin/bash\n"},
-            "/etc/hosts": {"type": "file", "content": "127.0.0.1 localhost\n127.0.1.1 ubuntu-server\n\n# The following lines are desirable for IPv6 capable hosts\n::1     ip6-localhost ip6-loopback\nfe00::0 ip6-localnet\nff00::0 ip6-mcastprefix\nff02::1 ip6-allnodes\nff02::2 ip6-allrouters\n"}
-        }
-
-    def _generate_ssh_key(self):
-        need_new_key = True
-        
-        if os.path.exists(self.ssh_key_path):
-            # Check if key file has valid content
-            try:
-                with open(self.ssh_key_path, 'r') as f:
-                    if f.read().strip():
-                        # File exists and has content
-                        need_new_key = False
-                        logger.info(f"SSH key already exists at {self.ssh_key_path}")
-                    else:
-                        logger.warning(f"SSH key file exists but is empty, regenerating")
-            except Exception as e:
-                logger.warning(f"Error reading SSH key file: {e}, regenerating")
-        
-        if need_new_key:
-            # Backup any existing file
-            if os.path.exists(self.ssh_key_path):
-                backup_path = f"{self.ssh_key_path}.bak.{int(datetime.datetime.now().timestamp())}"
-                try:
-                    os.rename(self.ssh_key_path, backup_path)
-                    logger.info(f"Backed up corrupted key file to {backup_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to back up key file: {e}")
-                    try:
-                        os.remove(self.ssh_key_path)
-                    except:
-                        pass
-            
-            # Generate new key
-            key = paramiko.RSAKey.generate(2048)
-            key.write_private_key_file(self.ssh_key_path)
-            os.chmod(self.ssh_key_path, 0o600)
-            logger.info(f"Generated SSH key at {self.ssh_key_path}")
 
     def check_channel_request(self, kind: str, chanid: int) -> int:
         return paramiko.OPEN_SUCCEEDED if kind == 'session' else paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
@@ -116,12 +260,12 @@ class SSHServer(paramiko.ServerInterface):
     def check_auth_password(self, username: str, password: str) -> int:
         self.username = username
         self.password = password
-        for user in self.allowed_users:
-            if username == user.get('username') and password == user.get('password'):
-                self.authenticated = True
-                logger.info(f"Authentication successful for {username} from {self.client_ip}")
-                return paramiko.AUTH_SUCCESSFUL
-        logger.warning(f"Authentication failed for {username} from {self.client_ip}")
+        attempt = password.encode()
+        if any(hmac.compare_digest(expected, attempt) for expected in self.credentials.get(username, ())):
+            self.authenticated = True
+            logger.info("Authentication successful for %s from %s", username, self.client_ip)
+            return paramiko.AUTH_SUCCESSFUL
+        logger.warning("Authentication failed for %s from %s", username, self.client_ip)
         return paramiko.AUTH_FAILED
 
     def check_channel_shell_request(self, channel) -> bool:
@@ -139,18 +283,18 @@ class SSHServer(paramiko.ServerInterface):
 
         try:
             transport = paramiko.Transport(client)
-            transport.add_server_key(paramiko.RSAKey(filename=self.ssh_key_path))
+            transport.add_server_key(self._host_key)
             transport.local_version = self.banner
             transport.start_server(server=self)
 
             chan = transport.accept(20)
             if chan is None:
-                logger.warning(f"No channel request from {self.client_ip}")
+                logger.warning("No channel request from %s", self.client_ip)
                 return
 
             self.event.wait(10)
             if not self.event.is_set():
-                logger.warning(f"Client {self.client_ip} never requested shell")
+                logger.warning("Client %s never requested shell", self.client_ip)
                 return
 
             # Send a realistic SSH banner with login information
@@ -159,35 +303,27 @@ class SSHServer(paramiko.ServerInterface):
                                                  minutes=random.randint(1, 59))).strftime("%a %b %d %H:%M:%S %Y")
             fake_ip = f"10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}"
             
-            welcome_banner = (
-                f"\r\n"
-                f"Welcome to Ubuntu 20.04.6 LTS (GNU/Linux 5.15.0-88-generic x86_64)\r\n"
-                f"\r\n"
-                f" * Documentation:  https://help.ubuntu.com\r\n"
-                f" * Management:     https://landscape.canonical.com\r\n"
-                f" * Support:        https://ubuntu.com/advantage\r\n"
-                f"\r\n"
-                f"  System information as of {datetime.datetime.now().strftime('%a %b %d %H:%M:%S %Z %Y')}\r\n"
-                f"\r\n"
-                f"  System load:  0.{random.randint(1, 20)}\r\n"
-                f"  Usage of /:   {random.randint(15, 40)}% of {random.randint(50, 500)}GB\r\n"
-                f"  Memory usage: {random.randint(15, 40)}%\r\n"
-                f"  Swap usage:   {random.randint(0, 5)}%\r\n"
-                f"  Processes:    {random.randint(100, 300)}\r\n"
-                f"\r\n"
-                f"{random.randint(0, 8)} updates can be applied immediately.\r\n"
-                f"{random.randint(0, 3)} of these updates are standard security updates.\r\n"
-                f"To see these additional updates run: apt list --upgradable\r\n"
-                f"\r\n"
-                f"Last login: {last_login} from {fake_ip}\r\n"
+            welcome_banner = _WELCOME_BANNER.format(
+                now=datetime.datetime.now().strftime('%a %b %d %H:%M:%S %Z %Y'),
+                load=random.randint(1, 20),
+                disk_pct=random.randint(15, 40),
+                disk_gb=random.randint(50, 500),
+                mem_pct=random.randint(15, 40),
+                swap_pct=random.randint(0, 5),
+                procs=random.randint(100, 300),
+                updates=random.randint(0, 8),
+                security_updates=random.randint(0, 3),
+                last_login=last_login,
+                fake_ip=fake_ip,
             )
             
-            chan.send(welcome_banner)
+            # One channel write for the whole banner
+            chan.sendall(welcome_banner.encode())
             
             self._handle_session(chan)
 
         except Exception as e:
-            logger.error(f"Exception handling client {self.client_ip}: {e}", exc_info=True)
+            logger.error("Exception handling client %s: %s", self.client_ip, e, exc_info=True)
 
         finally:
             if self.authenticated:
@@ -210,8 +346,8 @@ class SSHServer(paramiko.ServerInterface):
                 asyncio.run(self._send_log_to_nats(log_data))
                 
                 # Keep local logging as well
-                logger.info(f"Session ended for {self.username} from {self.client_ip}")
-                logger.info(f"Commands executed: {filtered_commands}")
+                logger.info("Session ended for %s from %s, commands executed: %s",
+                            self.username, self.client_ip, filtered_commands)
 
     def _filter_exit_commands(self, commands: list) -> list:
         """
@@ -227,93 +363,96 @@ class SSHServer(paramiko.ServerInterface):
 
     def _handle_session(self, chan):
         """Handle an interactive SSH session."""
-        buffer = ""
+        buffer = bytearray()
         # Send the initial prompt with properly formatted hostname and path
-        prompt = f"{self.username}@{self.hostname}:{self._get_prompt_path()}$ "
+        prompt = f"{self.username}@{self.hostname}:{self._get_prompt_path()}$ ".encode()
         chan.send(prompt)
         
-        while True:
+        closed = False
+        while not closed:
             try:
-                # Receive bytes one at a time
-                byte = chan.recv(1)
-                if not byte:  # Connection closed by client
+                # Read whatever the client has sent; pasted input arrives in one chunk
+                data = chan.recv(_RECV_SIZE)
+                if not data:  # Connection closed by client
                     break
                 
-                # Convert byte to character
-                char = byte.decode('utf-8', errors='replace')
-                
-                # Handle special characters
-                if char == '\x7f' or char == '\b':  # Backspace
-                    if buffer:
-                        buffer = buffer[:-1]
-                        chan.send('\b \b')  # Move back, erase, move back
-                    continue
-                elif char == '\x03':  # Ctrl+C
-                    chan.send('^C\r\n')  # Show ^C and go to new line
-                    buffer = ""  # Clear buffer
-                    chan.send(prompt)  # Show prompt again
-                    continue
-                elif char == '\x04':  # Ctrl+D (EOF)
-                    if not buffer:  # EOF on empty line means exit
-                        chan.send("logout\r\n")
-                        break
-                    continue  # Ignore otherwise
-                
-                # Regular character - echo it back
-                chan.send(char)
-                buffer += char
-                
-                # Handle Enter key
-                if char == '\r' or char == '\n':
-                    # Make sure we're at the start of a new line
-                    chan.send('\r\n')
+                # Echo is collected per chunk and sent in as few writes as possible
+                echo = bytearray()
+                for byte in data:
+                    # Handle special characters
+                    if byte == 0x7f or byte == 0x08:  # Backspace
+                        if buffer:
+                            # Drop the whole UTF-8 sequence, not just its last byte
+                            end = len(buffer) - 1
+                            while end > 0 and 0x80 <= buffer[end] < 0xC0:
+                                end -= 1
+                            del buffer[end:]
+                            echo += b'\b \b'  # Move back, erase, move back
+                        continue
+                    elif byte == 0x03:  # Ctrl+C
+                        echo += b'^C\r\n'  # Show ^C and go to new line
+                        echo += prompt  # Show prompt again
+                        buffer.clear()  # Clear buffer
+                        continue
+                    elif byte == 0x04:  # Ctrl+D (EOF)
+                        if not buffer:  # EOF on empty line means exit
+                            echo += b"logout\r\n"
+                            closed = True
+                            break
+                        continue  # Ignore otherwise
                     
-                    # Extract command and reset buffer
-                    command = buffer.strip('\r\n')
-                    buffer = ""
+                    # Regular character - echo it back
+                    echo.append(byte)
                     
-                    if command:  # Only process non-empty commands
-                        if self.authenticated:
-                            self.executed_commands.append(command)
-                            self.command_history.append(command)
+                    # Handle Enter key
+                    if byte == 0x0d or byte == 0x0a:
+                        # Make sure we're at the start of a new line
+                        echo += b'\r\n'
+                        chan.sendall(echo)
+                        echo.clear()
                         
-                        # Handle exit commands
-                        if command.lower() in self.EXIT_COMMANDS:
-                            chan.send("logout\r\n")
-                            time.sleep(0.2)
-                            chan.close()
-                            break
+                        # Extract command and reset buffer
+                        command = buffer.decode('utf-8', errors='replace')
+                        buffer.clear()
                         
-                        # Add a small delay for realism
-                        time.sleep(random.uniform(0.05, 0.2))
-                        
-                        # Get command response
-                        response = self._handle_command(command)
-                        
-                        # Send the response with proper line endings
-                        if response:
-                            # Clean up any inconsistent line endings
-                            response = response.replace('\r\n', '\n').replace('\r', '\n')
+                        if command:  # Only process non-empty commands
+                            if self.authenticated:
+                                self.executed_commands.append(command)
+                                self.command_history.append(command)
                             
-                            # Add proper line endings for the terminal
-                            lines = response.split('\n')
-                            for i, line in enumerate(lines):
-                                if line:  # Skip empty lines
-                                    chan.send(line)
-                                # Ensure we have a proper line ending after each line
-                                if i < len(lines) - 1 or response.endswith('\n'):
-                                    chan.send('\r\n')
-                                    
-                            # Always ensure we end with a line break if we didn't already
-                            if not response.endswith('\n'):
-                                chan.send('\r\n')
-                    
-                    # Always send a carriage return + line feed before the prompt
-                    # to ensure it starts on a new line, separate from any previous output
-                    chan.send(prompt)
+                            # Handle exit commands
+                            if command.lower() in self.EXIT_COMMANDS:
+                                chan.send("logout\r\n")
+                                time.sleep(0.2)
+                                chan.close()
+                                closed = True
+                                break
+                            
+                            # Add a small delay for realism
+                            time.sleep(random.uniform(0.05, 0.2))
+                            
+                            # Get command response
+                            response = self._handle_command(command)
+                            
+                            # Responses are already CRLF-terminated bytes
+                            if response:
+                                chan.sendall(response)
+                        
+                        # The prompt goes out with the next batch of echo
+                        echo += prompt
+                    else:
+                        buffer.append(byte)
+                        if len(buffer) > _MAX_LINE_BYTES:
+                            logger.warning("Input line from %s exceeded %d bytes, closing session",
+                                           self.client_ip, _MAX_LINE_BYTES)
+                            closed = True
+                            break
+                
+                if echo:
+                    chan.sendall(echo)
             
             except Exception as e:
-                logger.error(f"Error in SSH session: {e}", exc_info=True)
+                logger.error("Error in SSH session: %s", e, exc_info=True)
                 break
         
         # Close the channel when done
@@ -330,188 +469,125 @@ class SSHServer(paramiko.ServerInterface):
             return "~" + self.current_dir[len(f"/home/{self.username}"):]
         return self.current_dir
 
-    def _handle_command(self, cmd: str) -> str:
+    def _handle_command(self, cmd: str) -> bytes:
         """
-        Handle a command and return the response. 
+        Handle a command and return the encoded response. 
         Simplified to support only the most common commands.
+        Pipelines only run their first stage.
         """
-        cmd_parts = cmd.strip().split()
-        if not cmd_parts:
-            return ""
-            
-        command = cmd_parts[0].lower()
-        args = cmd_parts[1:] if len(cmd_parts) > 1 else []
+        command, args = _parse_command_line(cmd)
+        if not command:
+            return b""
         
-        # Core set of commands
-        if command == "ls":
-            return self._handle_ls(args)
-        elif command == "cd":
-            return self._handle_cd(args)
-        elif command == "pwd":
-            return self.current_dir
-        elif command == "cat":
-            return self._handle_cat(args)
-        elif command == "whoami":
-            return self.username
-        elif command == "ps":
-            return self._handle_ps()
-        elif command == "uname":
-            return self._handle_uname(args)
-        elif command == "date":
-            return self._handle_date(args)
-        
-        # Command not found for any other command
-        else:
-            return f"bash: {command}: command not found"
+        handler = self._COMMAND_HANDLERS.get(command)
+        if handler is None:
+            # Command not found for any other command
+            return _to_wire(f"bash: {command}: command not found")
+        return handler(self, args)
 
-    def _handle_ls(self, args: List[str]) -> str:
+    def _handle_ls(self, args: Sequence[str]) -> bytes:
         """Simple implementation of ls command."""
         target_dir = self.current_dir
         
-        # Parse simple flags
-        show_hidden = False
-        long_format = False
-        
+        # Parse simple flags into one set of flag characters
+        flags = set()
         for arg in args:
             if arg.startswith('-'):
-                if 'a' in arg:
-                    show_hidden = True
-                if 'l' in arg:
-                    long_format = True
-            elif not arg.startswith('-'):
+                flags.update(arg[1:])
+            else:
                 target_dir = self._resolve_path(arg)
                 break
+        show_hidden = 'a' in flags
+        long_format = 'l' in flags
         
-        if target_dir not in self.filesystem:
-            return f"ls: cannot access '{target_dir}': No such file or directory"
+        if target_dir not in _DIRS:
+            if target_dir in self.filesystem:
+                return _to_wire(f"ls: cannot list '{target_dir}': Not a directory")
+            return _to_wire(f"ls: cannot access '{target_dir}': No such file or directory")
         
-        if self.filesystem[target_dir]["type"] != "dir":
-            return f"ls: cannot list '{target_dir}': Not a directory"
+        # Listings are precomputed per directory in _LS_INDEX
+        columns, long_rows = _LS_INDEX[(target_dir, show_hidden)]
         
-        # Get the contents
-        contents = self.filesystem[target_dir]["content"]
-        
-        # Filter hidden files unless -a is used
-        if not show_hidden:
-            contents = [item for item in contents if not item.startswith('.')]
-            
-        # Sort with directories first for nicer display
-        dir_contents = []
-        file_contents = []
-        
-        for item in contents:
-            path = self._join_path(target_dir, item)
-            if path in self.filesystem and self.filesystem[path]["type"] == "dir":
-                dir_contents.append(item)
-            else:
-                file_contents.append(item)
-                
-        dir_contents.sort()
-        file_contents.sort()
-        contents = dir_contents + file_contents
-        
-        if not contents:
-            return ""
+        if not long_rows:
+            return b""
             
         if long_format:
-            # Long format (-l)
-            result = [f"total {len(contents)}"]
-            date_str = datetime.datetime.now().strftime("%b %d %H:%M")
-            
-            for item in contents:
-                path = self._join_path(target_dir, item)
-                if path in self.filesystem and self.filesystem[path]["type"] == "dir":
-                    line = f"drwxr-xr-x 2 {self.username} {self.username} 4096 {date_str} {item}"
-                else:
-                    line = f"-rw-r--r-- 1 {self.username} {self.username} {random.randint(100, 4000)} {date_str} {item}"
-                result.append(line)
-                
-            return "\n".join(result)
-        else:
-            # Format in columns like real ls
-            output = ""
-            col_width = max(len(item) for item in contents) + 2
-            num_cols = max(1, 80 // col_width)  # Assuming 80 chars terminal width
-            
-            # Group items into rows for columnar output
-            rows = []
-            for i in range(0, len(contents), num_cols):
-                row = contents[i:i+num_cols]
-                rows.append(row)
-                
-            # Build output with proper spacing
-            formatted_rows = []
-            for row in rows:
-                formatted_row = ""
-                for item in row:
-                    path = self._join_path(target_dir, item)
-                    if path in self.filesystem and self.filesystem[path]["type"] == "dir":
-                        formatted_row += f"{item}/".ljust(col_width)
-                    else:
-                        formatted_row += item.ljust(col_width)
-                formatted_rows.append(formatted_row)
-                
-            return "\n".join(formatted_rows)
+            # Long format (-l); only the owner and timestamp vary per call
+            date_str = datetime.datetime.now().strftime("%b %d %H:%M").encode()
+            user = self.username.encode()
+            result = [b"total %d\r\n" % len(long_rows)]
+            result.extend(b"%b %b %b %b %b %b\r\n" % (mode, user, user, size, date_str, item)
+                          for mode, size, item in long_rows)
+            return b"".join(result)
+        
+        return columns
 
-    def _handle_cd(self, args: List[str]) -> str:
+    def _handle_cd(self, args: Sequence[str]) -> bytes:
         """Simple implementation of cd command."""
         if not args:
             self.current_dir = f"/home/{self.username}"
-            return ""
+            return b""
         
         target_dir = self._resolve_path(args[0])
         
-        if target_dir not in self.filesystem:
-            return f"bash: cd: {args[0]}: No such file or directory"
-        
-        if self.filesystem[target_dir]["type"] != "dir":
-            return f"bash: cd: {args[0]}: Not a directory"
+        if target_dir not in _DIRS:
+            if target_dir in self.filesystem:
+                return _to_wire(f"bash: cd: {args[0]}: Not a directory")
+            return _to_wire(f"bash: cd: {args[0]}: No such file or directory")
         
         self.current_dir = target_dir
-        return ""
+        return b""
+
+    def _handle_pwd(self, args: Sequence[str]) -> bytes:
+        """Simple implementation of pwd command."""
+        return _to_wire(self.current_dir)
 
-    def _handle_cat(self, args: List[str]) -> str:
+    def _handle_cat(self, args: Sequence[str]) -> bytes:
         """Simple implementation of cat command."""
         if not args:
-            return ""
+            return b""
         
         filepath = self._resolve_path(args[0])
         
-        if filepath not in self.filesystem:
-            return f"cat: {args[0]}: No such file or directory"
-        
-        if self.filesystem[filepath]["type"] == "dir":
-            return f"cat: {args[0]}: Is a directory"
+        output = _CAT_OUTPUT.get(filepath)
+        if output is not None:
+            return output
         
-        return self.filesystem[filepath].get("content", "")
+        if filepath in _DIRS:
+            return _to_wire(f"cat: {args[0]}: Is a directory")
+        return _to_wire(f"cat: {args[0]}: No such file or directory")
 
-    def _handle_ps(self) -> str:
+    def _handle_whoami(self, args: Sequence[str]) -> bytes:
+        """Simple implementation of whoami command."""
+        return _to_wire(self.username)
+
+    def _handle_ps(self, args: Sequence[str]) -> bytes:
         """Simple implementation of ps command."""
-        header = "  PID TTY          TIME CMD"
-        processes = [
-            " 1234 pts/0    00:00:00 bash",
-            " 1256 pts/0    00:00:00 sshd",
-            " 2345 pts/0    00:00:00 ps"
-        ]
-        return header + "\n" + "\n".join(processes)
-
-    def _handle_uname(self, args: List[str]) -> str:
+        return _PS_OUTPUT
+
+    def _handle_uname(self, args: Sequence[str]) -> bytes:
         """Simple implementation of uname command."""
         if "-a" in args:
-            return "Linux ubuntu-server 5.15.0-88-generic #98-Ubuntu SMP Mon Mar 18 14:22:38 UTC 2024 x86_64 x86_64 x86_64 GNU/Linux"
-        return "Linux"
+            return _UNAME_ALL_OUTPUT
+        return _UNAME_OUTPUT
 
-    def _handle_date(self, args: List[str]) -> str:
+    def _handle_date(self, args: Sequence[str]) -> bytes:
         """Simple implementation of date command."""
-        return datetime.datetime.now().strftime("%a %b %d %H:%M:%S %Z %Y")
+        return _to_wire(datetime.datetime.now().strftime("%a %b %d %H:%M:%S %Z %Y"))
+
+    # Core set of commands, looked up by name in _handle_command
+    _COMMAND_HANDLERS = {
+        "ls": _handle_ls,
+        "cd": _handle_cd,
+        "pwd": _handle_pwd,
+        "cat": _handle_cat,
+        "whoami": _handle_whoami,
+        "ps": _handle_ps,
+        "uname": _handle_uname,
+        "date": _handle_date,
+    }
 
     # Path handling utilities
-    def _join_path(self, base: str, path: str) -> str:
-        """Join two path components."""
-        if base.endswith('/'):
-            return base + path
-        return base + '/' + path
-        
     def _dirname(self, path: str) -> str:
         """Get the directory name of a path."""
         if path == '/':
@@ -546,15 +622,15 @@ class SSHServer(paramiko.ServerInterface):
             result = self._dirname(self.current_dir)
         elif path.startswith("../"):
             parent = self._dirname(self.current_dir)
-            result = self._join_path(parent, path[3:])
+            result = _join(parent, path[3:])
         # Handle current directory
         elif path == ".":
             result = self.current_dir
         elif path.startswith("./"):
-            result = self._join_path(self.current_dir, path[2:])
+            result = _join(self.current_dir, path[2:])
         # Handle relative paths
         else:
-            result = self._join_path(self.current_dir, path)
+            result = _join(self.current_dir, path)
             
         # Normalize the path
         return self._normalize_path(result)
@@ -596,6 +672,70 @@ class SSHServer(paramiko.ServerInterface):
             sanitized_log_data = self._sanitize_log_data(log_data)
             await publisher.publish(sanitized_log_data)
             await publisher.close()
-            logger.info(f"Log published to NATS for session {self.session_id}")
+            logger.info("Log published to NATS for session %s", self.session_id)
         except Exception as e:
-            logger.error(f"Failed to publish log to NATS: {e}", exc_info=True)
+            logger.error("Failed to publish log to NATS: %s", e, exc_info=True)
+
+
+class SSHServer:
+    """
+    Process-wide honeypot state: configuration, credentials and host key.
+    Each connection gets its own lightweight _SSHSession.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        allowed_users = config.get('authentication', {}).get('allowed_users', [])
+        # username -> every encoded password configured for it (usernames may repeat);
+        # entries without a password never authenticate
+        credentials: Dict[str, Tuple[bytes, ...]] = {}
+        for user in allowed_users:
+            password = user.get('password')
+            if password is None:
+                continue
+            username = user.get('username')
+            credentials[username] = credentials.get(username, ()) + (str(password).encode(),)
+        self.credentials = credentials
+        self.ssh_key_path = config.get('ssh', {}).get('key_path', 'ssh_host_ecdsa_key')
+        self.banner = config.get('ssh', {}).get('banner', 'SSH-2.0-OpenSSH_8.2p1')
+
+        self._generate_ssh_key()
+        self.host_key = _load_host_key(self.ssh_key_path)
+
+    def _generate_ssh_key(self):
+        need_new_key = True
+        
+        if os.path.exists(self.ssh_key_path):
+            # Check if key file has valid content
+            try:
+                with open(self.ssh_key_path, 'r') as f:
+                    if f.read().strip():
+                        # File exists and has content
+                        need_new_key = False
+                        logger.info(f"SSH key already exists at {self.ssh_key_path}")
+                    else:
+                        logger.warning(f"SSH key file exists but is empty, regenerating")
+            except Exception as e:
+                logger.warning(f"Error reading SSH key file: {e}, regenerating")
+        
+        if need_new_key:
+            # Backup any existing file
+            if os.path.exists(self.ssh_key_path):
+                backup_path = f"{self.ssh_key_path}.bak.{int(datetime.datetime.now().timestamp())}"
+                try:
+                    os.rename(self.ssh_key_path, backup_path)
+                    logger.info(f"Backed up corrupted key file to {backup_path}")
+                except Exception as e:
+                    logger.warning(f"Failed to back up key file: {e}")
+                    try:
+                        os.remove(self.ssh_key_path)
+                    except:
+                        pass
+            
+            # Generate new key; P-256 keygen and signing are far cheaper than RSA-2048
+            key = paramiko.ECDSAKey.generate()
+            key.write_private_key_file(self.ssh_key_path)
+            os.chmod(self.ssh_key_path, 0o600)
+            logger.info(f"Generated SSH key at {self.ssh_key_path}")
+
+    def handle_client(self, client, addr: Tuple[str, int]):
+        _SSHSession(self).handle_client(client, addr)
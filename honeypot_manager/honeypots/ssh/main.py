@@ -8,6 +8,18 @@ import signal
 from typing import Dict, Any, Optional
 from SSHServer import SSHServer, logger
 
+try:  # libyaml-backed loader, bundled with the PyYAML wheels
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+# Each connection costs a session thread plus paramiko's transport thread;
+# neither needs the default 8 MiB stack reservation.
+THREAD_STACK_SIZE = 512 * 1024
+
+# Upper bound on concurrent sessions; further connections wait in the listen backlog
+MAX_SESSIONS = int(os.getenv("HIVE_SSH_WORKERS", "128"))
+
 
 def load_config(config_file: str) -> Dict[str, Any]:
     """
@@ -24,8 +36,8 @@ def load_config(config_file: str) -> Dict[str, Any]:
         ValueError: If the configuration file has invalid YAML
     """
     try:
-        with open(config_file, 'r') as file:
-            config = yaml.safe_load(file)
+        with open(config_file, 'rb') as file:
+            config = yaml.load(file, Loader=YamlLoader)
         logger.info(f"Configuration loaded from {config_file}")
         return config
     except FileNotFoundError:
@@ -77,6 +89,9 @@ def main() -> None:
         # Load configuration
         config = load_config('config.yaml')
         
+        # Applies to every thread started from here on, including paramiko's
+        threading.stack_size(THREAD_STACK_SIZE)
+        
         # Create server socket
         server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -89,24 +104,34 @@ def main() -> None:
             # Set up signal handlers for graceful shutdown
             setup_signal_handlers(server)
             
+            # Shared by every connection; per-session state lives in the session object
+            ssh_server = SSHServer(config)
+            session_slots = threading.BoundedSemaphore(MAX_SESSIONS)
+            
+            def run_session(client_sock: socket.socket, client_addr) -> None:
+                try:
+                    ssh_server.handle_client(client_sock, client_addr)
+                finally:
+                    session_slots.release()
+            
             # Main server loop
             while True:
+                # Stop accepting while every session slot is taken
+                session_slots.acquire()
                 try:
                     client_sock, client_addr = server.accept()
                     logger.info(f"Connection from {client_addr[0]}:{client_addr[1]}")
                     
-                    # Create SSH server instance
-                    ssh_server = SSHServer(config)
-                    
                     # Start a thread to handle this client
                     client_thread = threading.Thread(
-                        target=ssh_server.handle_client,
+                        target=run_session,
                         args=(client_sock, client_addr),
                         daemon=True  # Set as daemon so it will exit when main thread exits
                     )
                     client_thread.start()
                     
                 except (socket.error, OSError) as e:
+                    session_slots.release()
                     logger.error(f"Socket error accepting connection: {e}")
                     # Continue running to accept next connection
                     continue
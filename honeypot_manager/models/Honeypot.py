@@ -1,14 +1,20 @@
 from __future__ import annotations
 import os
+import copy
 import json
+import functools
 import socket
 import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
+from urllib.parse import quote
 
-import yaml
-
-from common.helpers import CONFIG, PodmanRunner, ImageManager, NetworkManager
+from common.helpers import CONFIG, PodmanRunner, ImageManager, NetworkManager, json_loads, not_found
 from honeypot_manager.util.exceptions import (
     HoneypotActiveConnectionsError,
     HoneypotContainerError,
@@ -22,13 +28,108 @@ from honeypot_manager.util.exceptions import (
 
 logger = logging.getLogger("hive.honeypot")
 
+# honeypot_manager/ package root, resolved once at import
+_BASE_DIR = Path(__file__).resolve().parent.parent
+_HONEYPOTS_DIR = os.path.join(_BASE_DIR, "honeypots")
+
+@functools.lru_cache(maxsize=None)
+def yaml_codec():
+    """
+    Import PyYAML on first use and pick the libyaml-backed safe loader and
+    dumper (CSafeLoader/CSafeDumper) when PyYAML was built with libyaml,
+    falling back to the pure-Python classes otherwise.
+
+    Returns:
+        (yaml module, loader class, dumper class)
+    """
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    return yaml, loader, dumper
+
+
+# Only the fields HoneypotManager tracks, one container per line
+_INSPECT_FIELDS = 6
+_INSPECT_FORMAT = (
+    "{{.Id}}|{{.Name}}|{{.State.Status}}"
+    '|{{index .Config.Labels "hive.type"}}|{{index .Config.Labels "hive.port"}}'
+    "|{{.Config.Image}}"
+)
+
+# Kernel socket tables and the TCP state codes used in them
+_PROC_TCP_TABLES = ("/proc/net/tcp", "/proc/net/tcp6")
+_TCP_ESTABLISHED = "01"
+_TCP_LISTEN = "0A"
+
+
+# Parsed tables are reused for this long (seconds) so back-to-back checks
+# within one request read /proc once
+_PROC_TCP_TTL = 0.1
+_proc_tcp_cache: Dict[str, Tuple[float, Optional[FrozenSet[int]]]] = {}
+
+
+def _proc_tcp_ports(state: str) -> Optional[FrozenSet[int]]:
+    """
+    Local ports with a socket in the given TCP state, read from
+    /proc/net/tcp{,6}. Returns None if the tables are unavailable
+    (e.g. on non-Linux hosts).
+    """
+    now = time.monotonic()
+    hit = _proc_tcp_cache.get(state)
+    if hit and now - hit[0] < _PROC_TCP_TTL:
+        return hit[1]
+    ports = set()
+    found_table = False
+    for table in _PROC_TCP_TABLES:
+        try:
+            with open(table, "r", encoding="ascii") as fh:
+                lines = fh.read().splitlines()
+        except OSError:
+            continue
+        found_table = True
+        for line in lines[1:]:  # skip header
+            cols = line.split()
+            if len(cols) > 3 and cols[3] == state:
+                ports.add(int(cols[1].rpartition(":")[2], 16))
+    result = frozenset(ports) if found_table else None
+    _proc_tcp_cache[state] = (now, result)
+    return result
+
+
+@dataclass(frozen=True, slots=True)
+class PortPlan:
+    """Container ports a honeypot type publishes, derived once per config load."""
+    fixed: Tuple[str, ...] = ()
+    passive: Optional[Tuple[int, int]] = None
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> PortPlan:
+        # guard against None in config
+        fixed = tuple(spec.split("/")[0] for spec in cfg.get("ports") or {})
+        passive_cfg = cfg.get("passive_ports") or []
+        try:
+            passive = (int(min(passive_cfg)), int(max(passive_cfg))) if passive_cfg else None
+        except (TypeError, ValueError) as exc:
+            # A bad range must not break loading every other type; publish no passive ports
+            logger.warning("Ignoring invalid passive_ports %r: %s", passive_cfg, exc)
+            passive = None
+        return cls(fixed, passive)
+
+    def publish_args(self, host_port: int) -> List[str]:
+        args = [a for cont in self.fixed for a in ("--publish", f"{host_port}:{cont}")]
+        if self.passive:
+            # passive_ports is an inclusive [start, end] range
+            start, end = self.passive
+            args += ["--publish", f"{start}-{end}:{start}-{end}"]
+        return args
+
 
 class HoneypotConfig:
     """
     Load and cache honeypot-type configurations from a YAML file.
     Falls back to defaults if the file is missing or malformed.
     """
-    _CONFIG_PATH = Path(__file__).resolve().parent.parent / "config" / "honeypot_configs.yaml"
+    _CONFIG_PATH = _BASE_DIR / "config" / "honeypot_configs.yaml"
     _DEFAULTS: Dict[str, Any] = {
         "ssh": {"ports": {"22/tcp": "honeypot_port"}},
         "ftp": {
@@ -36,23 +137,56 @@ class HoneypotConfig:
             "passive_ports": [60000, 60100],
         },
     }
-    _cache: Optional[Dict[str, Any]] = None
-    _mtime: float = 0.0
+    # The file is stat()ed at most once per interval (seconds)
+    _CHECK_INTERVAL = 1.0
+    _cache: Optional[Mapping[str, Any]] = None
+    _keys: FrozenSet[str] = frozenset()
+    _types_tuple: Tuple[str, ...] = ()
+    _port_plans: Dict[str, PortPlan] = {}
+    # (st_mtime_ns, st_size) of the file behind _cache
+    _token: Optional[Tuple[int, int]] = None
+    _last_check: float = 0.0
+
+    @classmethod
+    def _snapshot(cls, cfg: Dict[str, Any]) -> None:
+        # Build everything first so concurrent readers never mix old and new views
+        port_plans = {t: PortPlan.from_config(c if isinstance(c, dict) else {})
+                      for t, c in cfg.items()}
+        cache, keys, types_tuple = MappingProxyType(cfg), frozenset(cfg), tuple(cfg)
+        cls._port_plans = port_plans
+        cls._keys = keys
+        cls._types_tuple = types_tuple
+        cls._cache = cache
 
     @classmethod
-    def load(cls) -> Dict[str, Any]:
-        if not cls._CONFIG_PATH.exists():
-            return cls._DEFAULTS
-        mtime = cls._CONFIG_PATH.stat().st_mtime
-        if cls._cache and mtime <= cls._mtime:
+    def load(cls) -> Mapping[str, Any]:
+        now = time.monotonic()
+        if cls._cache is not None and now - cls._last_check < cls._CHECK_INTERVAL:
+            return cls._cache
+        cls._last_check = now
+        # One stat answers both "does it exist" and "has it changed"; the size
+        # catches rewrites within the filesystem's mtime granularity
+        try:
+            st = os.stat(cls._CONFIG_PATH)
+        except FileNotFoundError:
+            cls._snapshot(cls._DEFAULTS)
+            cls._token = None
             return cls._cache
+        token = (st.st_mtime_ns, st.st_size)
+        if cls._cache is not None and token == cls._token:
+            return cls._cache
+        yaml, loader, _ = yaml_codec()  # deferred: only needed when the file changed
         try:
-            with cls._CONFIG_PATH.open("r", encoding="utf-8") as fh:
-                cls._cache = yaml.safe_load(fh) or {}
-                cls._mtime = mtime
+            with open(cls._CONFIG_PATH, "rb") as fh:
+                cls._snapshot(yaml.load(fh, Loader=loader) or {})
+            cls._token = token
+        except FileNotFoundError:
+            cls._snapshot(cls._DEFAULTS)
+            cls._token = None
         except yaml.YAMLError as exc:
             logger.warning("Malformed YAML – falling back to defaults: %s", exc)
-            cls._cache = cls._DEFAULTS
+            cls._snapshot(cls._DEFAULTS)
+            cls._token = token
         return cls._cache
 
     @classmethod
@@ -62,13 +196,23 @@ class HoneypotConfig:
             raise HoneypotTypeNotFoundError(f"Unknown honeypot type '{t}'")
         return cfg[t] or {}
 
+    @classmethod
+    def port_plan(cls, t: str) -> PortPlan:
+        cls.load()
+        plan = cls._port_plans.get(t)
+        if plan is None:
+            raise HoneypotTypeNotFoundError(f"Unknown honeypot type '{t}'")
+        return plan
+
     @classmethod
     def exists(cls, t: str) -> bool:
-        return t in cls.load()
+        cls.load()
+        return t in cls._keys
 
     @classmethod
     def types(cls) -> List[str]:
-        return list(cls.load().keys())
+        cls.load()
+        return list(cls._types_tuple)
 
 
 class HoneypotManager:
@@ -76,10 +220,22 @@ class HoneypotManager:
     Manage a single honeypot container via Podman CLI.
     """
 
-    BASE_DIR = Path(__file__).resolve().parent.parent
+    BASE_DIR = _BASE_DIR
     NATS_URL = "nats://hive-nats-server:4222"
     NATS_STREAM = "honeypot"
     NATS_SUBJECT = "honeypot.logs"
+    # Parsed per-type config.yaml files keyed by path, validated by (mtime_ns, size)
+    _CFG_CACHE_SIZE = 100
+    _cfg_cache: "OrderedDict[Path, Tuple[int, int, Dict[str, Any]]]" = OrderedDict()
+    # Names of the directories under honeypots/, scanned lazily
+    _type_dirs: FrozenSet[str] = frozenset()
+    # Environment shared by every honeypot container
+    _NATS_ENV = (
+        "-e", f"NATS_URL={NATS_URL}",
+        "-e", f"NATS_STREAM={NATS_STREAM}",
+        "-e", f"NATS_SUBJECT={NATS_SUBJECT}",
+    )
+    _SECURITY_OPTS = ("--security-opt", "no-new-privileges")
 
     def __init__(
         self,
@@ -121,18 +277,66 @@ class HoneypotManager:
         authentication: Optional[Dict[str, Any]] = None,
         banner: Optional[str] = None,
     ) -> None:
-        cfg_path = self.BASE_DIR / "honeypots" / honeypot_type / "config.yaml"
-        if not cfg_path.exists():
-            raise FileNotFoundError(f"Config {cfg_path} not found")
+        cfg_path = self.type_config_path(honeypot_type)
+        cfg = self.load_type_config(cfg_path)
+        changed = False
+        if authentication is not None and cfg.get("authentication") != authentication:
+            cfg["authentication"] = authentication
+            changed = True
+        if banner is not None and cfg.get("banner") != banner:
+            cfg["banner"] = banner
+            changed = True
+        if not changed:
+            return
+        yaml, _, dumper = yaml_codec()
+        cfg_path.write_text(yaml.dump(cfg, Dumper=dumper, sort_keys=False))
+        self._cache_type_config(cfg_path, cfg)
+
+    @classmethod
+    def _has_type_dir(cls, honeypot_type: str) -> bool:
+        if honeypot_type in cls._type_dirs:
+            return True
+        # Unknown name: rescan once in case a type directory was added since
+        with os.scandir(_HONEYPOTS_DIR) as entries:
+            cls._type_dirs = frozenset(e.name for e in entries if e.is_dir())
+        return honeypot_type in cls._type_dirs
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def type_config_path(honeypot_type: str) -> Path:
+        return Path(os.path.join(_HONEYPOTS_DIR, honeypot_type, "config.yaml"))
+
+    @classmethod
+    def load_type_config(cls, cfg_path: Path) -> Dict[str, Any]:
+        """
+        Parse a honeypot's config.yaml, reusing the previous parse while the
+        file's mtime and size are unchanged. Callers get their own copy.
+        """
+        try:
+            st = cfg_path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Config {cfg_path} not found") from None
+        cached = cls._cfg_cache.get(cfg_path)
+        if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+            cls._cfg_cache.move_to_end(cfg_path)
+            return copy.deepcopy(cached[2])
+        yaml, loader, _ = yaml_codec()
         try:
-            cfg = yaml.safe_load(cfg_path.read_text()) or {}
+            cfg = yaml.load(cfg_path.read_text(), Loader=loader) or {}
         except yaml.YAMLError as exc:
             raise HoneypotError(f"Invalid YAML in {cfg_path}: {exc}")
-        if authentication is not None:
-            cfg["authentication"] = authentication
-        if banner is not None:
-            cfg["banner"] = banner
-        cfg_path.write_text(yaml.safe_dump(cfg, sort_keys=False))
+        cls._cache_type_config(cfg_path, cfg, st)
+        return cfg
+
+    @classmethod
+    def _cache_type_config(cls, cfg_path: Path, cfg: Dict[str, Any],
+                           st: Optional[os.stat_result] = None) -> None:
+        """Store `cfg` as the most recent entry, evicting the oldest past the bound."""
+        st = st or cfg_path.stat()
+        cls._cfg_cache[cfg_path] = (st.st_mtime_ns, st.st_size, copy.deepcopy(cfg))
+        cls._cfg_cache.move_to_end(cfg_path)
+        while len(cls._cfg_cache) > cls._CFG_CACHE_SIZE:
+            cls._cfg_cache.popitem(last=False)
 
     def create_honeypot(
         self,
@@ -146,15 +350,15 @@ class HoneypotManager:
         authentication: Optional[Dict[str, Any]] = None,
         banner: Optional[str] = None,
     ) -> None:
-        # 1) validations
-        if not HoneypotConfig.exists(honeypot_type):
-            raise HoneypotTypeNotFoundError(honeypot_type)
+        # 1) validations; the port plan lookup doubles as the type check
+        plan = HoneypotConfig.port_plan(honeypot_type)
+        if not self._has_type_dir(honeypot_type):
+            raise HoneypotTypeNotFoundError(f"No honeypot directory for type '{honeypot_type}'")
         self._validate_port(honeypot_port)
         if self.is_port_in_use(honeypot_port):
             raise HoneypotPortInUseError(f"Port {honeypot_port} is already in use")
 
-        # 2) prepare metadata and network
-        self.net_mgr.ensure_exists(CONFIG.network_name)
+        # 2) prepare metadata
         self.type = honeypot_type
         self.port = honeypot_port
         self.name = f"hive-{honeypot_type}-{honeypot_port}"
@@ -164,34 +368,22 @@ class HoneypotManager:
         if authentication or banner:
             self.update_honeypot_config(honeypot_type, authentication, banner)
 
-        # 4) build image
-        hp_dir = self.BASE_DIR / "honeypots" / honeypot_type
-        try:
-            self.img_mgr.ensure_built(self.image, hp_dir)
-        except Exception as exc:
-            raise HoneypotImageError(f"Image build failed: {exc}") from exc
+        # 4) ensure network and build image; independent podman calls, run side by side
+        hp_dir = os.path.join(_HONEYPOTS_DIR, honeypot_type)
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            fut_net = ex.submit(self.net_mgr.ensure_exists, CONFIG.network_name)
+            fut_img = ex.submit(self.img_mgr.ensure_built, self.image, hp_dir)
+            fut_net.result()
+            try:
+                fut_img.result()
+            except Exception as exc:
+                raise HoneypotImageError(f"Image build failed: {exc}") from exc
 
         # 5) assemble CLI args safely
-        cfg = HoneypotConfig.get(honeypot_type)
-        # guard against None in config
-        ports_cfg = cfg.get("ports") or {}
-        passive_cfg = cfg.get("passive_ports") or []
-        ports: List[str] = []
-        for spec in ports_cfg:
-            cont = spec.split("/")[0]
-            ports.extend(["--publish", f"{self.port}:{cont}"])
-        for p in passive_cfg:
-            ports.extend(["--publish", f"{p}:{p}"])
+        ports = plan.publish_args(self.port)
 
         vols = ["--volume", f"{hp_dir}:/app/config:ro"]
-
-        envs = [
-            "-e", f"NATS_URL={self.NATS_URL}",
-            "-e", f"NATS_STREAM={self.NATS_STREAM}",
-            "-e", f"NATS_SUBJECT={self.NATS_SUBJECT}",
-            "-e", f"HONEYPOT_TYPE={honeypot_type}",
-        ] or []
-
+        envs = [*self._NATS_ENV, "-e", f"HONEYPOT_TYPE={honeypot_type}"]
         cpu = ["--cpu-period", str(honeypot_cpu_limit), "--cpu-quota", str(honeypot_cpu_quota)]
         mem = ["--memory", self._format_memory(honeypot_memory_limit), "--memory-swap", self._format_memory(honeypot_memory_swap_limit)]
 
@@ -210,15 +402,14 @@ class HoneypotManager:
             "--label", "service=hive-honeypot-manager",
             f"--label=hive.type={honeypot_type}",
             f"--label=hive.port={honeypot_port}",
+            *cpu,
+            *mem,
+            *self._SECURITY_OPTS,
+            *envs,
+            *ports,
+            *vols,
+            self.image,
         ]
-        # extend in steps to avoid any NoneType unpack
-        if isinstance(cpu, list): cmd.extend(cpu)
-        if isinstance(mem, list): cmd.extend(mem)
-        cmd.extend(["--security-opt", "no-new-privileges"])
-        if isinstance(envs, list): cmd.extend(envs)
-        if isinstance(ports, list): cmd.extend(ports)
-        if isinstance(vols, list): cmd.extend(vols)
-        cmd.append(self.image)
 
         try:
             self.runner.run(cmd)
@@ -249,32 +440,128 @@ class HoneypotManager:
     def delete_honeypot(self) -> None:
         if self.status == "running":
             raise HoneypotContainerError("Stop container before deleting")
-        self._lifecycle("rm", extra=["-f"])
+        self._lifecycle("rm")
 
-    def _lifecycle(self, cmd: str, extra: List[str] = []) -> None:
+    # CLI verb -> libpod request; stop/restart wait out the container's stop timeout
+    def _lifecycle(self, cmd: str) -> None:
         try:
-            self.runner.run(["podman", cmd, *extra, self.name])
+            self.runner.container_action(cmd, self.name)
             if cmd != "rm":
-                self.get_honeypot_details(self.name)
+                self._refresh_status()
             else:
                 self.reset_metadata()
         except Exception as exc:
             raise HoneypotContainerError(f"{cmd} failed: {exc}") from exc
 
+    def _refresh_status(self) -> None:
+        """Re-read only the container state after a lifecycle action."""
+        data = self.runner.api_get(f"containers/{quote(self.name, safe='')}/json")
+        if data is not None:
+            self.status = data["State"]["Status"]
+            return
+        self.status = self.runner.run(
+            ["podman", "inspect", "--format", "{{.State.Status}}", self.name],
+            return_output=True
+        )
+
     def get_honeypot_details(self, identifier: str) -> Optional[HoneypotManager]:
+        try:
+            data = self.runner.api_get(f"containers/{quote(identifier, safe='')}/json")
+        except Exception as exc:
+            if not_found(exc):
+                return None
+            raise HoneypotContainerError(f"Inspect failed: {exc}") from exc
+        if data is not None:
+            return self._apply_inspect_json(data)
+
+        try:
+            out = self.runner.run(
+                ["podman", "inspect", identifier, "--format", _INSPECT_FORMAT],
+                return_output=True
+            )
+        except Exception as exc:
+            if not_found(exc):
+                return None
+            raise HoneypotContainerError(f"Inspect failed: {exc}") from exc
+
+        fields = (out or "").strip().split("|")
+        if len(fields) != _INSPECT_FIELDS:
+            return self._get_honeypot_details_json(identifier)
+        try:
+            self._apply_inspect_fields(fields)
+            return self
+        except Exception as exc:
+            raise HoneypotContainerError(f"Parsing inspect output failed: {exc}") from exc
+
+    @classmethod
+    def list_honeypots(
+        cls,
+        *filters: str,
+        runner: PodmanRunner | None = None,
+    ) -> List[HoneypotManager]:
+        """
+        Honeypots matching `podman ps` style filters (e.g. "label=hive.type=ssh"),
+        built from a single list call; its entries carry every field we report.
+        """
+        runner = runner or PodmanRunner()
+        query: Dict[str, List[str]] = {}
+        for f in filters:
+            key, _, value = f.partition("=")
+            query.setdefault(key, []).append(value)
+        containers = runner.api_get(
+            "containers/json?all=true&filters=" + quote(json.dumps(query), safe="")
+        )
+        if containers is None:
+            out = runner.run(
+                ["podman", "ps", "-a", "--format", "json", *(f"--filter={f}" for f in filters)],
+                return_output=True
+            )
+            containers = json_loads(out or "[]")
+        return [cls(runner=runner)._apply_list_json(c) for c in containers]
+
+    def _apply_list_json(self, data: Dict[str, Any]) -> HoneypotManager:
+        """Fill in from a `podman ps --format json` / containers/json entry."""
+        try:
+            self.id = data["Id"]
+            self.name = (data.get("Names") or [""])[0].lstrip("/")
+            self.status = data["State"]
+            labels = data.get("Labels") or {}
+            self.type = labels.get("hive.type")
+            self.port = int(labels.get("hive.port") or 0)
+            self.image = data.get("Image")
+            return self
+        except Exception as exc:
+            raise HoneypotContainerError(f"Parsing container list failed: {exc}") from exc
+
+    def _apply_inspect_fields(self, fields: List[str]) -> None:
+        cid, name, status, hp_type, port, image = fields
+        self.id = cid
+        self.name = name.lstrip("/")
+        self.status = status
+        self.type = hp_type or None
+        self.port = int(port or 0)
+        self.image = image or None
+
+    def _get_honeypot_details_json(self, identifier: str) -> Optional[HoneypotManager]:
+        """Full JSON inspect, used when the templated output can't be split."""
         try:
             out = self.runner.run(
                 ["podman", "inspect", identifier, "--format", "json"],
                 return_output=True
             )
         except Exception as exc:
-            msg = str(exc).lower()
-            if "no such" in msg:
+            if not_found(exc):
                 return None
             raise HoneypotContainerError(f"Inspect failed: {exc}") from exc
 
         try:
-            data = json.loads(out)[0]
+            data = json_loads(out)[0]
+        except Exception as exc:
+            raise HoneypotContainerError(f"Parsing inspect output failed: {exc}") from exc
+        return self._apply_inspect_json(data)
+
+    def _apply_inspect_json(self, data: Dict[str, Any]) -> HoneypotManager:
+        try:
             self.id = data["Id"]
             self.name = data["Name"].lstrip("/")
             self.status = data["State"]["Status"]
@@ -287,6 +574,16 @@ class HoneypotManager:
             raise HoneypotContainerError(f"Parsing inspect output failed: {exc}") from exc
 
     def _has_active_connections(self, port: int) -> bool:
+        established = _proc_tcp_ports(_TCP_ESTABLISHED)
+        if established is None:
+            return self._port_is_bound(port)
+        return port in established
+
+    @staticmethod
+    def _port_is_bound(port: int) -> bool:
+        listening = _proc_tcp_ports(_TCP_LISTEN)
+        if listening is not None:
+            return port in listening
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
             try:
                 s.bind(("0.0.0.0", port))
@@ -295,13 +592,21 @@ class HoneypotManager:
                 return True
 
     def is_port_in_use(self, port: int) -> bool:
-        out = self.runner.run(
-            ["podman", "ps", "-a", "--filter", f"label=hive.port={port}", "--format", "json"],
-            return_output=True
-        ) or "[]"
-        if json.loads(out):
+        # A listening socket settles it without spawning podman
+        if self._port_is_bound(port):
             return True
-        return self._has_active_connections(port)
+        # Otherwise look for a (possibly stopped) honeypot that claims the port
+        label = f"hive.port={port}"
+        containers = self.runner.api_get(
+            "containers/json?all=true&filters=" + quote(json.dumps({"label": [label]}), safe="")
+        )
+        if containers is None:
+            out = self.runner.run(
+                ["podman", "ps", "-a", "--quiet", "--filter", f"label={label}"],
+                return_output=True
+            )
+            return bool(out and out.strip())
+        return bool(containers)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
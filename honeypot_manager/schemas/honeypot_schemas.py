@@ -1,5 +1,5 @@
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class UserCredential(BaseModel):
@@ -24,11 +24,10 @@ class HoneypotCreate(BaseModel):
     authentication: Optional[AuthenticationConfig] = None
     banner: Optional[str] = None
 
-    class Config:
-        allow_population_by_field_name = True
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
-    @validator("honeypot_memory_limit", "honeypot_memory_swap_limit", pre=True)
+    @field_validator("honeypot_memory_limit", "honeypot_memory_swap_limit", mode="before")
+    @classmethod
     def _format_memory(cls, v):
         # ensure any integer values become strings with 'm' suffix
         if isinstance(v, int):
@@ -4,10 +4,9 @@ from __future__ import annotations
 from typing import Dict, List
 import subprocess
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, Field
 from starlette.concurrency import run_in_threadpool
-from asyncio import TimeoutError
 
 from log_manager.controllers.orchestrator import ServiceOrchestrator
 from common.helpers import PodmanError, ResourceError, logger
@@ -29,28 +28,32 @@ class StatusResponse(BaseModel):
     open_search_dashboard: str
 
 # ───────────────────────────── helpers ───────────────────────────────────────
-def _orchestrator(password: str | None = None) -> ServiceOrchestrator:
-    return ServiceOrchestrator(password)
+def _orchestrator(request: Request) -> ServiceOrchestrator:
+    """The app-wide orchestrator built in the lifespan handler."""
+    return request.app.state.orchestrator
 
 def _err(detail: str, code: int = status.HTTP_400_BAD_REQUEST):
     raise HTTPException(status_code=code, detail=detail)
 
 # ───────────────────────────── endpoints ─────────────────────────────────────
 @router.post("/create", response_model=SimpleResponse)
-async def create_services(body: AdminPasswordBody):
-    orch = _orchestrator(body.admin_password)
-    if orch.any_exists():
+async def create_services(body: AdminPasswordBody,
+                          shared: ServiceOrchestrator = Depends(_orchestrator)):
+    if shared.any_exists():
         _err("Required containers already exist. Delete them before creating again.")
+    # The admin password is baked into the create arguments, so use a dedicated instance
+    orch = ServiceOrchestrator(body.admin_password, executor=shared.executor)
     try:
         await run_in_threadpool(orch.create_all)
         return {"message": "Containers created successfully"}
     except (PodmanError, ResourceError) as e:
         logger.exception("Create failed")
         _err(str(e), status.HTTP_500_INTERNAL_SERVER_ERROR)
+    finally:
+        shared._invalidate()
 
 @router.post("/start", response_model=SimpleResponse)
-async def start_services():
-    orch = _orchestrator()
+async def start_services(orch: ServiceOrchestrator = Depends(_orchestrator)):
     miss = orch.missing()
     if miss:
         _err(f"Containers not found: {', '.join(miss)}. Create them first.")
@@ -66,8 +69,7 @@ async def start_services():
         _err(str(e), status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @router.post("/stop", response_model=SimpleResponse)
-async def stop_services():
-    orch = _orchestrator()
+async def stop_services(orch: ServiceOrchestrator = Depends(_orchestrator)):
     if orch.missing():
         _err("Containers do not exist – nothing to stop.")
     if not orch.any_running():
@@ -80,8 +82,7 @@ async def stop_services():
         _err(str(e), status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @router.delete("/delete", response_model=SimpleResponse)
-async def delete_services():
-    orch = _orchestrator()
+async def delete_services(orch: ServiceOrchestrator = Depends(_orchestrator)):
     if orch.missing():
         _err("Containers do not exist – nothing to delete.")
     if orch.any_running():
@@ -94,21 +95,21 @@ async def delete_services():
         _err(str(e), status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @router.post("/restart", response_model=SimpleResponse)
-async def restart_services():
-    orch = _orchestrator()
+async def restart_services(orch: ServiceOrchestrator = Depends(_orchestrator)):
     if orch.missing():
         _err("Containers do not exist – create them first.")
     try:
         await run_in_threadpool(orch.restart_all)
         return {"message": "Containers restarted successfully"}
+    except TimeoutError as e:
+        _err(str(e), status.HTTP_504_GATEWAY_TIMEOUT)
     except (PodmanError, ResourceError) as e:
         logger.exception("Restart failed")
         _err(str(e), status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @router.get("/status", response_model=StatusResponse)
-async def status_services():
-    orch = _orchestrator()
+async def status_services(orch: ServiceOrchestrator = Depends(_orchestrator)):
     s: Dict[str, str] = orch.status_report()
     return {
         "open_search_node": s.get("hive-opensearch-node", "not found"),
@@ -118,8 +119,7 @@ async def status_services():
     }
 
 @router.get("/services", response_model=List[str])
-async def list_running_services():
-    orch = _orchestrator()
+async def list_running_services(orch: ServiceOrchestrator = Depends(_orchestrator)):
     running_map = orch._running_map()
     running = [name for name, is_run in running_map.items() if is_run]
     if orch.opensearch.dashboard_status() == "running":
@@ -1,62 +1,150 @@
 from __future__ import annotations
 """High-level orchestration of all log-manager services."""
 
-from typing import Dict, List, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
 import time
+from urllib.parse import quote
 
-from common.helpers import logger
+from common.helpers import (
+    BaseContainerManager, ImageManager, NetworkManager, PodmanError, json_loads, logger,
+)
 from log_manager.models.OpenSearch_Manager import OpenSearchManager
 from log_manager.models.NATSServer_Manager import NatsServerManager
 from log_manager.models.Log_Collector_Manager import LogCollectorManager
 
 class ServiceOrchestrator:
     """Aggregate operations across the three container managers."""
-    def __init__(self, admin_password: Optional[str] = None) -> None:
+    # Seconds the status snapshot stays valid; covers the repeated checks in one request
+    STATUS_TTL = 2.0
+    # Pool size: one fan-out task per manager
+    WORKERS = 3
+
+    def __init__(self, admin_password: Optional[str] = None,
+                 executor: Optional[Executor] = None) -> None:
         admin_password = admin_password or "ChangeMe!"
+        # Normally the app-wide pool from the lifespan handler; standalone use gets its own
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=self.WORKERS,
+                                                        thread_name_prefix="hive-orchestrator")
         self.opensearch = OpenSearchManager(admin_password)
         self.nats       = NatsServerManager()
         self.collector  = LogCollectorManager(admin_password)
         self._all       = [self.opensearch, self.nats, self.collector]
+        self._status_cache: Optional[Tuple[float, Dict[str, str]]] = None
+
+    @property
+    def executor(self) -> Executor:
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the worker pool if this orchestrator created it."""
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    def _bulk_status(self) -> Dict[str, str]:
+        """Status of every managed container from a single list call."""
+        names = [m.name for m in self._all]
+        runner = self.opensearch.runner
+        filters = {"name": [f"^{n}$" for n in names]}
+        try:
+            containers = runner.api_get("containers/json?all=true&filters="
+                                      + quote(json.dumps(filters), safe=""))
+            if containers is None:
+                out = runner.run(
+                    ["podman", "ps", "-a", "--format", "json",
+                     *(f"--filter=name={f}" for f in filters["name"])],
+                    return_output=True,
+                )
+                containers = json_loads(out or "[]")
+        except PodmanError as exc:
+            logger.warning("Bulk status query failed, checking one by one: %s", exc)
+            return {m.name: m.status() for m in self._all}
+        found = {n.lstrip("/"): c.get("State", "") for c in containers for n in c.get("Names") or []}
+        return {n: found.get(n, "not found") for n in names}
+
+    def _cached_status(self, m: BaseContainerManager) -> str:
+        return self._status_map()[m.name]
+
+    def _invalidate(self) -> None:
+        self._status_cache = None
 
     def _exists_map(self) -> Dict[str, bool]:
-        return {m.name: m.exists() for m in self._all}
+        # status() reports 'not found' for a missing container
+        return {name: st != "not found" for name, st in self._status_map().items()}
 
     def _status_map(self) -> Dict[str, str]:
-        return {m.name: m.status() for m in self._all}
+        now = time.monotonic()
+        if self._status_cache is None or now - self._status_cache[0] >= self.STATUS_TTL:
+            self._status_cache = (now, self._bulk_status())
+        return dict(self._status_cache[1])
 
     def _running_map(self) -> Dict[str, bool]:
-        return {m.name: m.status() == "running" for m in self._all}
+        return {name: st == "running" for name, st in self._status_map().items()}
+
+    def _fan_out(self, action: str, managers: Iterable[BaseContainerManager]) -> None:
+        """Call `action` on every manager concurrently; re-raise the first failure."""
+        futures = [(m, self._executor.submit(getattr(m, action))) for m in managers]
+        wait([f for _, f in futures])
+        errors = [(m, f.exception()) for m, f in futures if f.exception()]
+        for m, exc in errors:
+            logger.error("%s failed for '%s': %s", action, m.name, exc)
+        if errors:
+            raise errors[0][1]
 
     def create_all(self) -> None:
-        for m in self._all:
-            m.create()
+        # Shared by all three pre_create hooks; create it once up front so they don't race
+        NetworkManager(self.opensearch.runner).ensure_exists()
+        try:
+            self._fan_out("create", self._all)
+        finally:
+            self._invalidate()
+
+    @staticmethod
+    def _wait_running(m: BaseContainerManager, timeout: float = 10.0) -> None:
+        """Poll until `m` reports running, backing off from 100 ms to 1 s."""
+        deadline = time.monotonic() + timeout
+        delay = 0.1
+        while m.status() != "running":
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"'{m.name}' did not reach running within {timeout:g}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
 
     def start_all(self) -> None:
-        if self.opensearch.status() != "running":
-            self.opensearch.start()
-        time.sleep(20)
-        if self.nats.status() != "running":
-            self.nats.start()
-        time.sleep(20)
-        if self.collector.status() != "running":
-            self.collector.start()
+        try:
+            # OpenSearch and NATS don't depend on each other; the collector needs NATS
+            self._fan_out("start", [m for m in (self.opensearch, self.nats)
+                                    if self._cached_status(m) != "running"])
+            self._wait_running(self.nats)
+            if self._cached_status(self.collector) != "running":
+                self.collector.start()
+        finally:
+            self._invalidate()
 
     def stop_all(self) -> None:
-        for m in reversed(self._all):
-            if m.status() == "running":
-                m.stop()
+        try:
+            self._fan_out("stop", [m for m in self._all if self._cached_status(m) == "running"])
+        finally:
+            self._invalidate()
 
     def delete_all(self) -> None:
-        for m in reversed(self._all):
-            m.delete()
+        try:
+            self._fan_out("delete", self._all)
+        finally:
+            self._invalidate()
+            # A fresh create re-verifies network and images, in case they were removed by hand
+            NetworkManager.invalidate()
+            ImageManager.invalidate()
 
     def restart_all(self) -> None:
-        for m in reversed(self._all):
-            if m.status() == "running":
-                m.stop()
-        time.sleep(2)
-        for m in self._all:
-            m.start()
+        try:
+            # `podman stop` returns once the container has exited; no settle delay needed
+            self._fan_out("stop", [m for m in self._all if self._cached_status(m) == "running"])
+        finally:
+            self._invalidate()
+        self.start_all()
 
     def any_exists(self) -> bool:
         return any(self._exists_map().values())
@@ -3,13 +3,25 @@ import json
 import sys
 import logging
 import os
+import signal
+from functools import lru_cache
 import geoip2.database
 from nats.aio.client import Client as NATS
 from nats.js.api import RetentionPolicy, AckPolicy, StreamConfig, ConsumerConfig, ReplayPolicy, DeliverPolicy
+from nats.js.errors import APIError, NotFoundError
 from urllib.parse import urlparse
-from opensearchpy import OpenSearch, exceptions as os_exceptions
+from opensearchpy import AsyncOpenSearch, exceptions as os_exceptions
 from datetime import datetime
 
+try:  # C JSON codec; parses the NATS payload bytes without a decode step
+    import orjson
+    json_loads = orjson.loads
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    json_loads = json.loads
+    json_dumps = json.dumps
+
 # Basic logging setup
 logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 
@@ -23,25 +35,50 @@ OPENSEARCH_PASSWORD = os.environ.get("OPENSEARCH_PASSWORD")
 NATS_URL = os.environ.get("NATS_URL")
 INDEX_NAME = "hive-logs"
 
-# Parse host URL and build OpenSearch client (HTTP, no SSL)
-parsed = urlparse(OPENSEARCH_URL)
-host = parsed.hostname or OPENSEARCH_URL
-port = parsed.port or 9200
-use_ssl = (parsed.scheme == "https")
-client = OpenSearch(
-    hosts=[{"host": host, "port": port}],
-    http_auth=(OPENSEARCH_USER, OPENSEARCH_PASSWORD),
-    use_ssl=use_ssl,
-    verify_certs=False,
-    ssl_show_warn=False,
-    http_compress=True
-)
+# Messages are pulled, indexed and acked in batches of up to BATCH_SIZE
+BATCH_SIZE = 256
+BATCH_WINDOW = 1.0  # seconds one fetch may wait to fill a batch
+DURABLE_NAME = "log-collector"
+STREAM_NAME_IN_USE = 10058  # JetStream API error code
+
+# OpenSearch setup retries at startup (~2 minutes with backoff)
+SETUP_ATTEMPTS = 15
+
+def _build_client() -> AsyncOpenSearch:
+    """
+    Build the OpenSearch client from the container environment. Missing settings
+    fail here rather than surfacing as two minutes of setup retries.
+    """
+    missing = [name for name, value in (("OPENSEARCH_HOST", OPENSEARCH_URL),
+                                        ("OPENSEARCH_USER", OPENSEARCH_USER),
+                                        ("OPENSEARCH_PASSWORD", OPENSEARCH_PASSWORD))
+               if not value]
+    if missing:
+        raise RuntimeError(f"Missing environment variables: {', '.join(missing)}")
+
+    parsed = urlparse(OPENSEARCH_URL)
+    host = parsed.hostname or OPENSEARCH_URL
+    port = parsed.port or 9200
+    use_ssl = (parsed.scheme == "https")
+    logging.info(f"OpenSearch endpoint: {host}:{port} (ssl={use_ssl})")
+    return AsyncOpenSearch(
+        hosts=[{"host": host, "port": port}],
+        http_auth=(OPENSEARCH_USER, OPENSEARCH_PASSWORD),
+        use_ssl=use_ssl,
+        verify_certs=False,
+        ssl_show_warn=False,
+        http_compress=True
+    )
+
+client = _build_client()
 
 # Define index settings and mappings for log data
 INDEX_SETTINGS = {
     "settings": {
         "number_of_shards": 1,
-        "number_of_replicas": 0
+        "number_of_replicas": 0,
+        # Fewer segment refreshes under bulk ingest; dashboards may lag by up to this much
+        "refresh_interval": "30s"
     },
     "mappings": {
         "properties": {
@@ -70,9 +107,21 @@ INDEX_TEMPLATE = {
     "template": INDEX_SETTINGS
 }
 
+def _parse_timestamp(value):
+    """
+    Honeypots emit ISO-8601 with a trailing "Z"; fromisoformat handles that in C.
+    dateutil is only pulled in for anything it rejects.
+    """
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        from dateutil import parser
+        return parser.parse(value)
+
 async def message_handler(msg):
+    """Parse and enrich one message; returns the document, or None if it is unusable"""
     try:
-        data = json.loads(msg.data.decode())
+        data = json_loads(msg.data)
         attacker_ip = data.get("attacker_ip")
         
         # Calculate duration of attack
@@ -80,15 +129,10 @@ async def message_handler(msg):
         exit_time = data.get("time_of_exit")
         if entry_time and exit_time:
             try:
-                from datetime import datetime
-                from dateutil import parser
-                
-                entry_datetime = parser.parse(entry_time)
-                exit_datetime = parser.parse(exit_time)
-                duration = exit_datetime - entry_datetime
-                
                 # Store duration in seconds
-                data["duration_of_attack"] = int(duration.total_seconds())
+                data["duration_of_attack"] = int(
+                    (_parse_timestamp(exit_time) - _parse_timestamp(entry_time)).total_seconds()
+                )
             except Exception as e:
                 logging.warning(f"Failed to calculate duration: {e}")
                 data["duration_of_attack"] = 0
@@ -98,17 +142,19 @@ async def message_handler(msg):
         if geo_data:
             data.update(geo_data)
         
-        logging.info(f"[Received and Enriched] {json.dumps(data, indent=2)}")
-
-        # Index enriched log document (async to avoid blocking)
-        await insert_into_opensearch(data)
-        await msg.ack()
+        # Serialising the whole document is the costliest part of this handler; skip it when INFO is off
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info("[Received and Enriched] %s", json_dumps(data))
+        return data
     except Exception as e:
         logging.error(f"Failed to process message: {e}")
+        return None
 
-async def lookup_geolocation(ip_address):
+@lru_cache(maxsize=65536)
+def _geo_for_ip(ip_address):
     """
-    Enhanced geolocation lookup with proper geo_point formatting
+    GeoIP lookup, memoised per address: scanners hit the honeypots repeatedly
+    from the same hosts. Returns (lat, lon, country) or None.
     """
     try:
         response = geoip_reader.city(ip_address)
@@ -129,19 +175,8 @@ async def lookup_geolocation(ip_address):
         
         # Get additional location info
         country = response.country.name or "Unknown"
-        
-        # Format for OpenSearch geo_point (multiple formats supported)
-        # Using the most reliable format: object with lat/lon
-        geo_data = {
-            "location": {
-                "lat": float(latitude),
-                "lon": float(longitude)
-            },
-            "country": country
-        }
-        
         logging.info(f"GeoIP lookup successful for {ip_address}: {country} ({latitude}, {longitude})")
-        return geo_data
+        return float(latitude), float(longitude), country
         
     except geoip2.errors.AddressNotFoundError:
         logging.warning(f"IP {ip_address} not found in GeoIP database")
@@ -150,25 +185,47 @@ async def lookup_geolocation(ip_address):
         logging.warning(f"GeoIP lookup failed for {ip_address}: {e}")
         return None
 
-async def insert_into_opensearch(document):
-    """Insert document into OpenSearch with improved error handling"""
+async def lookup_geolocation(ip_address):
+    """
+    Enhanced geolocation lookup with proper geo_point formatting
+    """
     try:
-        # Add timestamp for when the document was indexed
-        document["@timestamp"] = datetime.utcnow().isoformat()
-        
-        # Debug: Log the location data being sent
-        if "location" in document:
-            logging.info(f"Sending location data: {document['location']}")
+        geo = _geo_for_ip(ip_address)
+    except TypeError:  # unhashable / malformed attacker_ip
+        return None
+    if geo is None:
+        return None
+    latitude, longitude, country = geo
+    # Format for OpenSearch geo_point (multiple formats supported)
+    # Using the most reliable format: object with lat/lon
+    return {
+        "location": {
+            "lat": latitude,
+            "lon": longitude
+        },
+        "country": country
+    }
+
+async def insert_into_opensearch(documents):
+    """Bulk-insert documents into OpenSearch; returns a success flag per document"""
+    try:
+        # Add timestamp for when the documents were indexed
+        timestamp = datetime.utcnow().isoformat()
+        body = []
+        for document in documents:
+            document["@timestamp"] = timestamp
+            body.append({"index": {"_index": INDEX_NAME}})
+            body.append(document)
         
-        # Index the document using the OpenSearch client (in a thread)
-        result = await asyncio.to_thread(
-            client.index,
-            index=INDEX_NAME,
-            body=document
-        )
-        doc_id = result.get('_id')
-        logging.info(f"[✓] Indexed document (ID: {doc_id}) into '{INDEX_NAME}'")
-        return True
+        # One bulk request on the event loop; no thread hop per batch
+        result = await client.bulk(body=body)
+        items = [item.get("index", {}) for item in result.get("items", [])]
+        ok = [not item.get("error") for item in items]
+        for item in items:
+            if item.get("error"):
+                logging.error(f"[✗] Request error (check mapping/schema): {item['error']}")
+        logging.info(f"[✓] Indexed {sum(ok)}/{len(documents)} documents into '{INDEX_NAME}'")
+        return ok
     except os_exceptions.ConnectionError as e:
         logging.error(f"[✗] Connection error: {e}")
     except os_exceptions.AuthorizationException as e:
@@ -178,35 +235,60 @@ async def insert_into_opensearch(document):
         # Log the full error details for debugging
         logging.error(f"Full error details: {e.info if hasattr(e, 'info') else 'No additional info'}")
     except Exception as e:
-        logging.error(f"[✗] Failed to insert document: {e}")
-    return False
+        logging.error(f"[✗] Failed to insert documents: {e}")
+    return [False] * len(documents)
+
+async def batch_indexer(sub):
+    """Pull messages in batches: one fetch, one bulk request and one round of acks each"""
+    while True:
+        try:
+            msgs = await sub.fetch(BATCH_SIZE, timeout=BATCH_WINDOW)
+        except asyncio.TimeoutError:
+            continue  # nothing pending
+        except Exception as e:
+            logging.error(f"Failed to fetch messages: {e}")
+            await asyncio.sleep(1)
+            continue
+        
+        # Unusable messages are left unacked and redelivered, as before
+        enriched = await asyncio.gather(*(message_handler(msg) for msg in msgs))
+        batch = [(msg, data) for msg, data in zip(msgs, enriched) if data is not None]
+        if not batch:
+            continue
+        
+        ok = await insert_into_opensearch([data for _, data in batch])
+        results = await asyncio.gather(
+            *(msg.ack() for (msg, _), indexed in zip(batch, ok) if indexed),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logging.error(f"Failed to ack message: {result}")
 
 async def setup_opensearch():
     """Set up OpenSearch index with template"""
     try:
         # First, delete existing index if it exists to recreate with proper mapping
-        if await asyncio.to_thread(client.indices.exists, index=INDEX_NAME):
+        if await client.indices.exists(index=INDEX_NAME):
             logging.info(f"Deleting existing index '{INDEX_NAME}' to recreate with proper mapping...")
-            await asyncio.to_thread(client.indices.delete, index=INDEX_NAME)
+            await client.indices.delete(index=INDEX_NAME)
             
         # 1. Create index template
-        await asyncio.to_thread(
-            client.indices.put_index_template,
+        await client.indices.put_index_template(
             name=f"{INDEX_NAME}-template",
             body=INDEX_TEMPLATE
         )
         logging.info(f"[✓] Created/updated index template for '{INDEX_NAME}*'")
         
         # 2. Create index with proper mapping
-        await asyncio.to_thread(
-            client.indices.create,
+        await client.indices.create(
             INDEX_NAME,
             body=INDEX_SETTINGS
         )
         logging.info(f"[✓] Created index '{INDEX_NAME}' in OpenSearch with geo_point mapping")
         
         # 3. Verify the mapping was created correctly
-        mapping = await asyncio.to_thread(client.indices.get_mapping, index=INDEX_NAME)
+        mapping = await client.indices.get_mapping(index=INDEX_NAME)
         location_mapping = mapping[INDEX_NAME]['mappings']['properties'].get('location', {})
         logging.info(f"Location field mapping: {location_mapping}")
         
@@ -220,10 +302,17 @@ async def setup_opensearch():
     return False
 
 async def main():
-    # Set up OpenSearch index and template
-    if not await setup_opensearch():
-        logging.error("Failed to set up OpenSearch. Exiting.")
-        return
+    # Set up OpenSearch index and template; the node may still be booting
+    delay = 1
+    for attempt in range(1, SETUP_ATTEMPTS + 1):
+        if await setup_opensearch():
+            break
+        if attempt == SETUP_ATTEMPTS:
+            logging.error("Failed to set up OpenSearch. Exiting.")
+            return
+        logging.info(f"OpenSearch not ready, retrying in {delay}s ({attempt}/{SETUP_ATTEMPTS})")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 10)
 
     # NATS/JetStream setup
     nc = NATS()
@@ -233,43 +322,70 @@ async def main():
     stream_name = "honeypot"
     stream_subject = "honeypot.logs"
 
+    # add_stream is idempotent for an identical config; 10058 means the stream exists
+    # with another one (e.g. created first by a honeypot publisher), which is fine too
+    stream_config = StreamConfig(
+        name=stream_name,
+        subjects=[stream_subject],
+        retention=RetentionPolicy.WORK_QUEUE,
+        storage="file",
+        max_age=60
+    )
     try:
-        await js.stream_info(stream_name)
-        logging.info(f"Stream already exists: {stream_name}")
-    except Exception:
-        logging.info(f"Creating new stream: {stream_name}")
-        stream_config = StreamConfig(
-            name=stream_name,
-            subjects=[stream_subject],
-            retention=RetentionPolicy.WORK_QUEUE,
-            storage="file",
-            max_age=60
-        )
         await js.add_stream(config=stream_config)
-        logging.info(f"Created stream '{stream_name}' with subject '{stream_subject}'")
+        logging.info(f"Stream '{stream_name}' ready with subject '{stream_subject}'")
+    except APIError as e:
+        if e.err_code != STREAM_NAME_IN_USE:
+            raise
+        logging.info(f"Stream already exists: {stream_name}")
 
     consumer_config = ConsumerConfig(
-        durable_name="log-collector",
+        durable_name=DURABLE_NAME,
         ack_policy=AckPolicy.EXPLICIT,
         max_ack_pending=500,
         replay_policy=ReplayPolicy.INSTANT,
         deliver_policy=DeliverPolicy.ALL
     )
 
-    await js.subscribe(
-        subject=stream_subject,
-        durable="log-collector",
-        cb=message_handler,
+    # Earlier releases created this durable as a push consumer; it cannot be pulled from.
+    # Its unacked messages stay in the work-queue stream for the replacement.
+    try:
+        info = await js.consumer_info(stream_name, DURABLE_NAME)
+        if info.config.deliver_subject:
+            logging.info(f"Replacing push consumer '{DURABLE_NAME}' with a pull consumer")
+            await js.delete_consumer(stream_name, DURABLE_NAME)
+    except NotFoundError:
+        pass
+
+    sub = await js.pull_subscribe(
+        stream_subject,
+        durable=DURABLE_NAME,
+        stream=stream_name,
         config=consumer_config,
-        manual_ack=True,
     )
+    indexer = asyncio.create_task(batch_indexer(sub))
 
-    logging.info("[✓] Subscribed and listening for log messages...")
-    while True:
-        await asyncio.sleep(1)
+    # Sleep until the container is stopped instead of waking up every second
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    logging.info("[✓] Subscribed and pulling log messages...")
+    await stop.wait()
+
+    logging.info("Shutting down; unacked messages will be redelivered")
+    indexer.cancel()
+    await nc.drain()
+
+async def run():
+    try:
+        await main()
+    finally:
+        await client.close()
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        asyncio.run(run())
     finally:
         geoip_reader.close()
\ No newline at end of file
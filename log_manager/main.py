@@ -2,13 +2,32 @@ from __future__ import annotations
 
 """Entry-point for Project H.I.V.E – Log-Manager API."""
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from common.helpers import PodmanRunner
 from log_manager.controllers.log_manager_router import router as log_router
+from log_manager.controllers.orchestrator import ServiceOrchestrator
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One worker pool for fan-out, and one orchestrator (so one
+    # status cache) shared by every request
+    app.state.pool = ThreadPoolExecutor(max_workers=ServiceOrchestrator.WORKERS,
+                                        thread_name_prefix="hive-log-manager")
+    app.state.orchestrator = ServiceOrchestrator(executor=app.state.pool)
+    yield
+    app.state.pool.shutdown(wait=True)
+    PodmanRunner().close()
+
 
 app = FastAPI(
     title="Project H.I.V.E – Log-Manager API",
     description="REST endpoints that orchestrate OpenSearch, NATS and log-collector services inside rootless Podman.",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # include all endpoints at root
@@ -11,10 +11,10 @@ from pathlib import Path
 
 from common.helpers import (
     BaseContainerManager,
+    CONFIG,
     ImageManager,
     NetworkManager,
     PodmanRunner,
-    logger,
 )
 
 class LogCollectorManager(BaseContainerManager):
@@ -29,7 +29,9 @@ class LogCollectorManager(BaseContainerManager):
 
         self.create_args = [
             "--hostname", self.name,
-            "--network", "bridge",
+            # Joined with its alias at create time; no separate `network connect`
+            "--network", CONFIG.network_name,
+            "--network-alias", self.name,
             "--env", "NATS_URL=nats://hive-nats-server:4222",
             "--env", "OPENSEARCH_USER=admin",
             "--env", f"OPENSEARCH_PASSWORD={admin_password}",
@@ -51,7 +53,3 @@ class LogCollectorManager(BaseContainerManager):
             dockerfile_dir=self.dockerfile_dir,
             dockerfile="Dockerfile.subscriber",
         )
-
-    def post_create(self):
-        self.network_mgr.connect(self.name, alias=self.name)
-        logger.debug("Log collector connected to hive-net")
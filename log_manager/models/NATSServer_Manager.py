@@ -8,7 +8,7 @@ Fixes:
 • image name is passed only once
 • explicit 'nats-server --js -m 8222' command stops the entrypoint
   from mis-parsing the image string
-• container starts inside the hive-net bridge with a DNS alias
+• container is created on the hive-net bridge with its DNS alias
 """
 
 from typing import List
@@ -34,6 +34,7 @@ class NatsServerManager(BaseContainerManager):
         self._pre_flags: List[str] = [
             "--hostname", self.name,
             "--network",  CONFIG.network_name,
+            "--network-alias", self._ALIAS,
             "--label",    "owner=hive",
             "--label",    f"hive.type={self.name}",
             "--restart",  "always",
@@ -72,9 +73,3 @@ class NatsServerManager(BaseContainerManager):
         """Pull image and make sure *hive-net* exists."""
         self.network_mgr.ensure_exists()
         self.image_mgr.ensure_pulled(self.image)
-
-    def post_create(self):
-        """Connect an alias to simplify service discovery."""
-        self.network_mgr.connect(self.name, alias=self._ALIAS)
-        logger.info("[✓] NATS connected to '%s' with alias '%s'",
-                    CONFIG.network_name, self._ALIAS)
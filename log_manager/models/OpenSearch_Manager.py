@@ -1,7 +1,8 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing   import Final
-import shutil, subprocess, time, base64, json
+import shutil, time, base64, json
 
 from common.helpers import (
     BaseContainerManager, PodmanRunner, ImageManager,
@@ -40,23 +41,31 @@ class OpenSearchManager(BaseContainerManager):
             raise ResourceError(f"Need ≥{self._MIN_DISK_GB} GB free for OpenSearch")
 
         self.network_mgr.ensure_exists()
-        ImageManager(self.runner).ensure_pulled(self.image)
-        ImageManager(self.runner).ensure_pulled(self._DASH_IMAGE)
 
-        if subprocess.run(["podman","volume","exists",self._VOLUME]).returncode:
-            self.runner.run(["podman","volume","create",self._VOLUME])
-            logger.info("[✓] Volume '%s' created", self._VOLUME)
+        # Node and dashboard images are the two largest downloads; pull them side by side
+        # while the volume and pod are set up. This runs inside the orchestrator's pool, so
+        # the pulls get their own: queueing them there could wait behind their own caller.
+        images = ImageManager(self.runner)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            pulls = [pool.submit(images.ensure_pulled, img) for img in (self.image, self._DASH_IMAGE)]
 
-        if subprocess.run(["podman","pod","exists",self._POD]).returncode:
-            self.runner.run([
-                "podman","pod","create","--name",self._POD,
-                "--network",CONFIG.network_name,
-                "-p","5601:5601",
-            ])
-            logger.info("[✓] Pod '%s' created", self._POD)
+            if not self.runner.exists("volume", self._VOLUME):
+                self.runner.run(["podman","volume","create",self._VOLUME])
+                logger.info("[✓] Volume '%s' created", self._VOLUME)
+
+            if not self.runner.exists("pod", self._POD):
+                self.runner.run([
+                    "podman","pod","create","--name",self._POD,
+                    "--network",CONFIG.network_name,
+                    "-p","5601:5601",
+                ])
+                logger.info("[✓] Pod '%s' created", self._POD)
+
+            for fut in pulls:
+                fut.result()
 
     def post_create(self) -> None:
-        if subprocess.run(["podman","container","exists",self._DASH_NAME]).returncode==0:
+        if self.runner.exists("container", self._DASH_NAME):
             return
         self.runner.run([
             "podman","create","--name",self._DASH_NAME,"--pod",self._POD,
@@ -71,29 +80,25 @@ class OpenSearchManager(BaseContainerManager):
         super().start()                       # start node
         logger.info("[~] Sleeping %s s for OpenSearch bootstrap", self._BOOT_WAIT)
         time.sleep(self._BOOT_WAIT)
-        self.runner.run(["podman","start",self._DASH_NAME])
+        self.runner.container_action("start", self._DASH_NAME)
         logger.info("[✓] Dashboard started")
 
     def stop(self):
-        self.runner.run(["podman","stop",self._DASH_NAME])
+        self.runner.container_action("stop", self._DASH_NAME)
         super().stop()
 
     def delete(self):
         # Try to stop the dashboard if it's running
         try:
-            result = self.runner.run(
-                ["podman", "inspect", "-f", "{{.State.Status}}", self._DASH_NAME],
-                capture_output=True
-            )
-            if result.stdout.strip() == "running":
-                self.runner.run(["podman", "stop", self._DASH_NAME])
+            if self.dashboard_status() == "running":
+                self.runner.container_action("stop", self._DASH_NAME)
                 logger.info("[✓] Dashboard container '%s' stopped", self._DASH_NAME)
         except Exception:
             logger.warning("[!] Could not inspect or stop dashboard – continuing deletion")
 
         # Try to remove the dashboard
         try:
-            self.runner.run(["podman", "rm", "-f", self._DASH_NAME])
+            self.runner.container_action("rm", self._DASH_NAME)
             logger.info("[✓] Dashboard container '%s' deleted", self._DASH_NAME)
         except Exception:
             logger.warning("[!] Failed to remove dashboard container – it may not exist")
@@ -104,11 +109,7 @@ class OpenSearchManager(BaseContainerManager):
 
     def dashboard_status(self) -> str:
         try:
-            state = self.runner.run(
-                ["podman", "inspect", "-f", "{{.State.Status}}", self._DASH_NAME],
-                return_output=True
-            ).strip()
-            return state if state else "not found"
+            return self._state(self._DASH_NAME) or "not found"
         except Exception as e:
             logger.warning("[!] Dashboard status check failed: %s", e)
             return "not found"
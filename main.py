@@ -51,7 +51,7 @@ def check_and_install_requirements():
             cmd = [
                 python_cmd, "-m", "pip", "install", 
                 "Flask>=2.0.0", "python-dotenv>=0.19.0", "requests>=2.26.0",
-                "fastapi>=0.70.0", "uvicorn>=0.15.0", "pydantic>=1.9.0",
+                "fastapi>=0.93.0", "uvicorn[standard]>=0.15.0", "pydantic>=2.0",
                 "PyYAML>=6.0", "aiohttp>=3.8.1",
                 "pywin32"  # Windows-specific
             ]
@@ -61,7 +61,7 @@ def check_and_install_requirements():
             cmd = [
                 python_cmd, "-m", "pip", "install", 
                 "Flask>=2.0.0", "python-dotenv>=0.19.0", "requests>=2.26.0",
-                "fastapi>=0.70.0", "uvicorn>=0.15.0", "pydantic>=1.9.0",
+                "fastapi>=0.93.0", "uvicorn[standard]>=0.15.0", "pydantic>=2.0",
                 "PyYAML>=6.0", "aiohttp>=3.8.1",
                 "simplepam"  # Unix-specific
             ]